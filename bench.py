@@ -0,0 +1,658 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+BENCHMARK SCRAPER (OFFLINE)
+===========================
+Menjalankan scraper terhadap server HTTP lokal (stub), bukan situs asli.
+
+  python bench.py fetch --domains 4 --pages 10 --latency 0.05 [--rest-domains 1]
+  python bench.py parse [--fixtures DIR] [--repeat 20]
+  python bench.py compose [--tweets 10] [--latency-ms 300]   (butuh Chrome)
+
+Suite regresi dengan halaman rekaman (sekali online, selanjutnya offline):
+
+  python bench.py record [--out bench_fixtures/recorded] [--pages 10]
+  python bench.py suite [--fixtures bench_fixtures/recorded] [--save-baseline]
+
+bench_fixtures/baseline.json bawaan diukur dengan sumber stub (suite tanpa rekaman); angkanya
+tergantung mesin, jadi simpan ulang dengan --save-baseline sebelum dipakai sebagai patokan.
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import logging
+import pathlib
+import tempfile
+import threading
+import tracemalloc
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlsplit
+from typing import List, Tuple, Dict, Callable, Optional
+from statistics import mean
+from contextlib import contextmanager
+
+from bs4 import BeautifulSoup
+
+import main as bot
+
+FIXTURE_DIR = pathlib.Path(__file__).resolve().parent / "bench_fixtures"
+X_HOME_MOCK = FIXTURE_DIR / "x_home.html"
+RECORDED_DIR = FIXTURE_DIR / "recorded"
+BASELINE_JSON = FIXTURE_DIR / "baseline.json"
+
+#########################
+# STUB SERVER
+#########################
+def wp_category_html(domain: str, page: int, per_page: int = 10) -> str:
+    items = []
+    for i in range(per_page):
+        n = (page - 1) * per_page + i
+        items.append(
+            f'<article class="post"><h2 class="entry-title">'
+            f'<a href="http://{domain}/artikel-{n}/">Artikel {domain} nomor {n}</a></h2>'
+            f'<div class="entry-summary"><p>Ringkasan artikel {n}.</p></div></article>'
+        )
+    return (
+        "<!doctype html><html><head><title>Artikel</title></head><body>"
+        "<header><nav><a href='/'>Home</a></nav></header><main>"
+        + "".join(items)
+        + "</main><footer>footer</footer></body></html>"
+    )
+
+def wp_rest_posts(domain: str, page: int, per_page: int) -> List[dict]:
+    return [
+        {"link": f"http://{domain}/artikel-{n}/", "title": {"rendered": f"Artikel {domain} nomor {n}"}}
+        for n in range((page - 1) * per_page, page * per_page)
+    ]
+
+def make_handler(latency: float, max_pages: int, per_page: int = 10):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def send_json(self, data, status: int = 200, headers=None):
+            body = json.dumps(data).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=UTF-8")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_rest(self, route: str, q: dict):
+            # tiruan minimal /wp-json/wp/v2 untuk kategori dan daftar post
+            if route.endswith("/categories"):
+                return self.send_json([{"id": 7}])
+            if not route.endswith("/posts"):
+                return self.send_json({"code": "rest_no_route"}, 404)
+            rest_per_page = int(q.get("per_page", ["10"])[0])
+            total = max_pages * per_page
+            pages = -(-total // rest_per_page)
+            page = int(q.get("page", ["1"])[0])
+            if page > pages:
+                return self.send_json({"code": "rest_post_invalid_page_number"}, 400)
+            items = [p for p in wp_rest_posts(self.headers.get("Host", "stub"), page, rest_per_page)
+                     if int(p["link"].rstrip("/").rsplit("-", 1)[1]) < total]
+            self.send_json(items, headers={"X-WP-Total": str(total), "X-WP-TotalPages": str(pages)})
+
+        def do_GET(self):
+            time.sleep(latency)
+            path, _, query = self.path.partition("?")
+            if self.rest_enabled:
+                q = parse_qs(query)
+                if path.startswith("/wp-json"):
+                    return self.do_rest(path[len("/wp-json"):], q)
+                if "rest_route" in q:
+                    return self.do_rest(q["rest_route"][0], q)
+            elif path.startswith("/wp-json") or "rest_route=" in query:
+                body = b"not found"
+                self.send_response(404)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            page = 1
+            if "/page/" in path:
+                page = int(path.rstrip("/").rsplit("/", 1)[1])
+            elif query.startswith("paged="):
+                page = int(query.split("=", 1)[1])
+            if page > max_pages:
+                body, status = b"not found", 404
+            else:
+                body, status = wp_category_html(self.headers.get("Host", "stub"), page).encode("utf-8"), 200
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    Handler.rest_enabled = True
+    return Handler
+
+def start_stub_servers(n: int, latency: float, max_pages: int, rest: int = 0) -> List[ThreadingHTTPServer]:
+    # rest: jumlah server pertama yang juga melayani REST WordPress
+    servers = []
+    for i in range(n):
+        handler = make_handler(latency, max_pages)
+        handler.rest_enabled = i < rest
+        srv = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+        servers.append(srv)
+    return servers
+
+#########################
+# FIXTURE HTML
+#########################
+# beberapa gaya tema WordPress yang umum, dipakai kalau --fixtures tidak diisi
+_THEME_ITEMS = {
+    "entry-title": '<article class="post"><header><h2 class="entry-title"><a href="{href}">{title}</a></h2></header><p>{body}</p></article>',
+    "post-title": '<div class="blog-post"><h2 class="post-title"><a href="{href}">{title}</a></h2><p>{body}</p></div>',
+    "article-h3": '<article><h3 class="entry-title"><a href="{href}">{title}</a></h3><div><a href="{href}">Baca</a></div></article>',
+    "article-only": '<article><a href="{href}"><img src="x.jpg"></a><h3>{title}</h3><p>{body}</p></article>',
+    # inline bersarang + tail, komentar, dan script di dalam link judul
+    "nested-inline": '<article class="post"><h2 class="entry-title"><a href="{href}"><span><b>Tips</b> {title}</span> '
+                     'Batik <!-- x --><i>Tulis</i><script>var x=1;</script> Asli</a></h2><p>{body}</p></article>',
+}
+
+def synthetic_fixtures(per_page: int = 12) -> List[Tuple[str, str]]:
+    body = "Lorem ipsum dolor sit amet, " * 20
+    sidebar = "".join(f'<li><a href="/tag/{i}/">Tag {i}</a></li>' for i in range(40))
+    out = []
+    for name, tpl in _THEME_ITEMS.items():
+        items = "".join(
+            tpl.format(href=f"https://{name}.test/artikel-{i}/", title=f"Judul artikel {name} {i}", body=body)
+            for i in range(per_page)
+        )
+        html = (
+            "<!doctype html><html><head><title>x</title>" + "<script>var a=1;</script>" * 10 + "</head><body>"
+            f"<nav><ul>{sidebar}</ul></nav><main>{items}</main><aside><ul>{sidebar}</ul></aside>"
+            "<footer>" + "<p>footer</p>" * 30 + "</footer></body></html>"
+        )
+        out.append((name, html))
+    return out
+
+def load_fixtures(directory) -> List[Tuple[str, str]]:
+    if not directory:
+        return synthetic_fixtures()
+    root = pathlib.Path(directory)
+    paths = sorted(root.glob("**/*.html"))
+    # fixture rekaman ada di folder per domain; nama folder dipakai sebagai domain parse_posts
+    return [(p.parent.name if p.parent != root else p.name, p.read_text(encoding="utf-8", errors="replace"))
+            for p in paths]
+
+def parse_posts_legacy(html: str) -> List[Tuple[str, str]]:
+    # implementasi parse_posts lama (BeautifulSoup + 6 select berurutan), jadi pembanding
+    soup = BeautifulSoup(html, "lxml")
+    seen = set()
+    results: List[Tuple[str, str]] = []
+    for sel, _, _ in bot.WP_TITLE_SELECTORS:
+        for a in soup.select(sel):
+            title = a.get_text(strip=True)
+            href = a.get("href")
+            if not title or not href:
+                continue
+            key = (title, href)
+            if key in seen:
+                continue
+            seen.add(key)
+            results.append((title, href))
+    if not results:
+        for art in soup.find_all("article"):
+            a = art.find("a", href=True)
+            h = None
+            for hx in ["h1", "h2", "h3"]:
+                htag = art.find(hx)
+                if htag and htag.get_text(strip=True):
+                    h = htag.get_text(strip=True)
+                    break
+            if a and h:
+                results.append((h, a["href"]))
+    return results
+
+#########################
+# REKAM & REPLAY
+#########################
+def isolated_state(workdir: pathlib.Path):
+    # data/ bot (cache HTTP, profil situs) dialihkan ke folder sementara dan
+    # cache di memori dikosongkan, jadi tiap run mulai dingin seperti pertama kali jalan
+    workdir.mkdir(parents=True, exist_ok=True)
+    os.chdir(workdir)
+    bot.SITE_PROFILES.data = None
+    with bot._domain_selectors_lock:
+        bot._domain_selectors.clear()
+    bot.close_sessions()
+    bot.FETCH_STATS.clear()
+
+@contextmanager
+def isolated_run():
+    # isolated_state di folder sementara lalu cwd dikembalikan: data/ di repo tidak tersentuh
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        isolated_state(pathlib.Path(tmp))
+        try:
+            yield pathlib.Path(tmp)
+        finally:
+            os.chdir(cwd)
+
+def _fixture_name(key: str, content_type: str) -> str:
+    ext = ".json" if "json" in content_type else ".html"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16] + ext
+
+def record_fixtures(out_dir: pathlib.Path, max_pages: int) -> Dict:
+    # jalankan gather_all_posts sungguhan dan simpan setiap respons HTTP yang diminta scraper;
+    # situs load-more tanpa REST butuh Chrome, jadi dilewati (tidak bisa diputar ulang lewat HTTP)
+    recorded: List[Tuple[str, int, str, bytes]] = []
+    lock = threading.Lock()
+    real_get, real_pool = bot.safe_get, bot.run_selenium_pool
+
+    def recording_get(url, timeout=20, headers=None, slot=None):
+        resp = real_get(url, timeout, headers, slot)
+        with lock:
+            recorded.append((url, resp.status_code, resp.headers.get("Content-Type", ""), resp.content))
+        return resp
+
+    def skip_selenium(jobs, size):
+        logging.warning(f"Rekam: {len(jobs)} situs Selenium dilewati")
+        return [[] for _ in jobs]
+
+    sites = [s._replace(max_pages=max_pages) for s in bot.load_sites()]
+    cwd = os.getcwd()
+    bot.safe_get, bot.run_selenium_pool = recording_get, skip_selenium
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            isolated_state(pathlib.Path(tmp))
+            posts = bot.gather_all_posts(scrape_only=True, sites=sites)
+    finally:
+        bot.safe_get, bot.run_selenium_pool = real_get, real_pool
+        os.chdir(cwd)
+
+    index = {
+        "recorded_at": int(time.time()),
+        "max_pages": max_pages,
+        "sites": [s._asdict() for s in sites],
+        "posts": len(posts),
+        "responses": {},
+    }
+    for url, status, ctype, body in recorded:
+        parts = urlsplit(url)
+        key = parts.path + (f"?{parts.query}" if parts.query else "")
+        name = _fixture_name(key, ctype)
+        (out_dir / parts.netloc).mkdir(parents=True, exist_ok=True)
+        (out_dir / parts.netloc / name).write_bytes(body)
+        index["responses"].setdefault(parts.netloc, {})[key] = {"status": status, "content_type": ctype, "file": name}
+    with open(out_dir / "index.json", "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    return index
+
+def load_index(fixture_dir: pathlib.Path) -> Optional[Dict]:
+    path = fixture_dir / "index.json"
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def make_replay_handler(fixture_dir: pathlib.Path, responses: Dict[str, Dict]):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            rec = responses.get(self.path)
+            if rec is None:
+                body, status, ctype = b"not recorded", 404, "text/plain"
+            else:
+                body, status, ctype = (fixture_dir / rec["file"]).read_bytes(), rec["status"], rec["content_type"]
+            self.send_response(status)
+            self.send_header("Content-Type", ctype or "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+def start_replay_servers(fixture_dir: pathlib.Path, index: Dict) -> Tuple[List[ThreadingHTTPServer], Dict[str, str]]:
+    # satu server per domain rekaman di port berbeda; hasil kedua: domain asli -> host:port lokal
+    servers, hosts = [], {}
+    for dom, responses in index["responses"].items():
+        srv = ThreadingHTTPServer(("127.0.0.1", 0), make_replay_handler(fixture_dir / dom, responses))
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+        servers.append(srv)
+        hosts[dom] = f"127.0.0.1:{srv.server_address[1]}"
+    return servers, hosts
+
+def replay_sites(index: Dict, hosts: Dict[str, str]) -> List[bot.Site]:
+    sites = []
+    for entry in index["sites"]:
+        site = bot.Site(**entry)
+        parts = urlsplit(site.url)
+        if parts.netloc in hosts:
+            url = f"http://{hosts[parts.netloc]}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+            sites.append(site._replace(url=url))
+    return sites
+
+def stub_sites(servers, rest: int) -> List[bot.Site]:
+    # tiap server beda port -> beda "domain" bagi limiter per-domain;
+    # `rest` server pertama lewat jalur REST (bukan Selenium)
+    return [bot.Site(url=f"http://127.0.0.1:{s.server_address[1]}/category/artikel/",
+                     method="rest" if i < rest else "http")
+            for i, s in enumerate(servers)]
+
+#########################
+# BENCHMARK
+#########################
+def _timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def bench_parse(args):
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        print("Tidak ada fixture HTML.")
+        return 1
+    print(f"{'fixture':24s} {'lama':>9s} {'baru':>9s} {'baru+dom':>9s}  speedup  sama")
+    with isolated_run():
+        _bench_parse_rows(fixtures, args.repeat)
+
+def _bench_parse_rows(fixtures: List[Tuple[str, str]], repeat: int):
+    for name, html in fixtures:
+        expected = parse_posts_legacy(html)
+        same = bot.parse_posts(html) == expected
+        bot.parse_posts(html, name)  # pelajari selector untuk "domain" fixture ini
+        t_old = _timeit(lambda: parse_posts_legacy(html), repeat)
+        t_new = _timeit(lambda: bot.parse_posts(html), repeat)
+        t_dom = _timeit(lambda: bot.parse_posts(html, name), repeat)
+        print(f"{name[:24]:24s} {t_old * 1000:8.2f}ms {t_new * 1000:8.2f}ms {t_dom * 1000:8.2f}ms  "
+              f"{t_old / t_new:6.1f}x  {'ya' if same else 'TIDAK'}")
+
+def bench_fetch(args):
+    servers = start_stub_servers(args.domains, args.latency, args.pages, args.rest_domains)
+    sites = stub_sites(servers, args.rest_domains)
+    total_pages = len(sites) * len(bot.paginate_urls(sites[0].url, bot.MAX_PAGES_PER_SITE))
+
+    def gather():
+        return bot.gather_all_posts(sites=sites)
+
+    def legacy():
+        # perilaku lama: semua URL kedua skema diambil berurutan tanpa berhenti di halaman terakhir
+        posts = []
+        for site in sites:
+            for url in bot.paginate_urls(site.url, bot.MAX_PAGES_PER_SITE):
+                resp = bot.safe_get(url)
+                if resp.status_code == 200:
+                    posts.extend(bot.parse_posts(resp.text))
+        return bot.dedupe_posts(posts)
+
+    rows = []
+    for label, limits, fn in (
+        ("lama", (1, 1), legacy),
+        ("serial", (1, 1), gather),
+        ("paralel", (bot.MAX_CONCURRENT_FETCHES, bot.MAX_FETCHES_PER_DOMAIN), gather),
+    ):
+        # tiap baris mulai dingin: cache HTTP dan profil situs dari baris sebelumnya tidak ikut terpakai
+        with isolated_run():
+            bot.set_fetch_limits(*limits)
+            t0 = time.perf_counter()
+            posts = fn()
+            dt = time.perf_counter() - t0
+            n_req = int(sum(st["requests"] for st in bot.FETCH_STATS.values()))
+        rows.append((label, limits, dt, len(posts), n_req))
+
+    print(f"domain={args.domains} halaman/domain={args.pages} latency={args.latency}s (maks {total_pages // args.domains} URL/domain)")
+    for label, limits, dt, n, n_req in rows:
+        print(f"  {label:8s} global={limits[0]:<2d} per-domain={limits[1]:<2d} {dt:7.2f}s  {n_req:4d} request  {n} post")
+    for s in servers:
+        s.shutdown()
+
+def compose_times(tweets: int, latency_ms: int) -> Tuple[int, List[float]]:
+    # waktu per tweet pada tiruan composer X (bench_fixtures/x_home.html), butuh Chrome
+    drivers = bot.DriverManager(headless=True, profile_dir=None)
+    try:
+        driver = drivers.get()
+        driver.get(f"{X_HOME_MOCK.as_uri()}#latency={latency_ms}")
+        bot.wait_home_ready(driver, timeout=10)
+        times = []
+        for i in range(tweets):
+            t0 = time.perf_counter()
+            ok = bot.send_tweet_on_home(driver, f"Tweet benchmark nomor {i} https://contoh.test/{i}/")
+            bot.scroll_natural(driver)
+            times.append(time.perf_counter() - t0)
+            if not ok:
+                print(f"tweet {i} gagal")
+        posted = driver.execute_script("return window.__posted.length")
+    finally:
+        drivers.quit()
+    return posted, times
+
+def bench_compose(args):
+    # overhead per tweet di luar DELAY_TWEET_RANGE, diukur pada tiruan composer X
+    # acuan (Chrome 141 headless, 1 CPU, 10 tweet): overhead ~0.33s/tweet pada latency 0, 300,
+    # dan 1000ms; ketik ~0.21s, klik ~0.06s, sisanya menunggu composer kosong
+    posted, times = compose_times(args.tweets, args.latency_ms)
+    overhead = [t - args.latency_ms / 1000 for t in times]
+    print(f"{posted}/{args.tweets} tweet terkirim, latency server tiruan {args.latency_ms}ms")
+    print(f"  per tweet: rata-rata {mean(times):.3f}s, maks {max(times):.3f}s")
+    print(f"  overhead di luar latency: rata-rata {mean(overhead):.3f}s, maks {max(overhead):.3f}s")
+
+def bench_record(args):
+    out = pathlib.Path(args.out).resolve()
+    index = record_fixtures(out, args.pages)
+    n = sum(len(r) for r in index["responses"].values())
+    print(f"{n} respons dari {len(index['responses'])} domain direkam ke {out} ({index['posts']} post)")
+
+#########################
+# SUITE REGRESI
+#########################
+_WORDS = [f"{a}{b}{c}" for a in ("ba", "ka", "ma", "sa", "ta", "la", "ra", "pa") for b in ("ti", "ku", "ne", "ro", "sa")
+          for c in ("", "k", "n", "ng", "r", "s", "t", "h", "l", "m")]
+
+def synthetic_posts(n: int, dup_ratio: float = 0.3, domains: int = 19) -> List[Tuple[str, str]]:
+    # judul 5-10 kata acak (mirip judul artikel asli, bukan templat), duplikat pakai judul yang sama
+    rng = random.Random(1)
+    posts = []
+    for i in range(n):
+        j = rng.randrange(i) if i and rng.random() < dup_ratio else i
+        words = random.Random(j).sample(_WORDS, 5 + j % 6)
+        posts.append((f" {' '.join(words).capitalize()} ", f"https://situs{j % domains}.test/artikel-{j}/"))
+    return posts
+
+def measure(fn: Callable[[], int], repeat: int, min_time: float = 0.05) -> Dict:
+    # seperti timeit: GC dimatikan, fungsi cepat diulang dalam satu sampel sampai >= min_time,
+    # diambil sampel terbaik; lalu satu run lagi di bawah tracemalloc untuk puncak memori Python
+    gc.collect()
+    gc.disable()
+    try:
+        loops = 1
+        while True:
+            t0 = time.perf_counter()
+            for _ in range(loops):
+                items = fn()
+            dt = time.perf_counter() - t0
+            if dt >= min_time or loops >= 1024:
+                break
+            loops *= 2
+        best = dt / loops
+        for _ in range(repeat - 1):
+            t0 = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            best = min(best, (time.perf_counter() - t0) / loops)
+    finally:
+        gc.enable()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"items": items, "seconds": best, "per_sec": items / best if best else 0.0, "peak_kb": peak / 1024}
+
+def suite_benchmarks(fixtures: List[Tuple[str, str]], workdir: pathlib.Path, n_posts: int) -> Dict[str, Callable[[], int]]:
+    posts = synthetic_posts(n_posts)
+    unique = bot.dedupe_posts(posts)
+    already = {u for _, u in unique[::4]}
+    home = [f"Tweet home nomor {i}" for i in range(20)]
+    texts = [f"{t} {u}" for t, u in unique]
+    queue_path = workdir / "queue.journal"
+
+    def parse() -> int:
+        for name, html in fixtures:
+            bot.parse_posts(html, name)
+        return len(fixtures)
+
+    def dedupe() -> int:
+        bot.dedupe_posts(posts)
+        return len(posts)
+
+    def build() -> int:
+        bot.build_queue(list(unique), home, already)
+        return len(unique)
+
+    def queue_cycle() -> int:
+        # tulis antrean penuh, buka ulang (replay journal), lalu selesaikan sebagian item
+        queue_path.unlink(missing_ok=True)
+        store = bot.QueueStore(queue_path)
+        store.replace(texts)
+        store.close()
+        store = bot.QueueStore(queue_path)
+        for _ in range(min(len(store), 200)):
+            index, _ = store.claim(bot.DEFAULT_ACCOUNT)
+            store.mark_done(index)
+        store.close()
+        return len(texts)
+
+    return {"parse_posts": parse, "dedupe_posts": dedupe, "build_queue": build, "queue_save_load": queue_cycle}
+
+def gather_benchmark(fixture_dir: pathlib.Path, workdir: pathlib.Path):
+    # end-to-end gather_all_posts lewat server replay; tanpa rekaman pakai server stub sintetis
+    index = load_index(fixture_dir) if fixture_dir else None
+    if index:
+        servers, hosts = start_replay_servers(fixture_dir, index)
+        sites = replay_sites(index, hosts)
+        source = f"replay:{fixture_dir.name}"
+    else:
+        servers = start_stub_servers(4, 0.0, bot.MAX_PAGES_PER_SITE, rest=1)
+        sites = stub_sites(servers, 1)
+        source = "stub"
+    bot.run_selenium_pool = lambda jobs, size: [[] for _ in jobs]
+    bot.set_fetch_limits(bot.MAX_CONCURRENT_FETCHES, bot.MAX_FETCHES_PER_DOMAIN)
+    runs = [0]
+
+    def gather() -> int:
+        runs[0] += 1
+        isolated_state(workdir / f"run{runs[0]}")
+        return len(bot.gather_all_posts(scrape_only=True, sites=sites))
+
+    return source, servers, gather
+
+def print_report(results: Dict[str, Dict], baseline: Optional[Dict], tolerance: float) -> List[str]:
+    regressions = []
+    base = (baseline or {}).get("results", {})
+    print(f"{'benchmark':18s} {'item':>7s} {'item/detik':>12s} {'vs base':>8s} {'puncak mem':>11s} {'vs base':>8s}")
+    for name, r in results.items():
+        b = base.get(name)
+        d_speed = d_mem = ""
+        if b:
+            speed = r["per_sec"] / b["per_sec"] - 1 if b["per_sec"] else 0.0
+            mem = r["peak_kb"] / b["peak_kb"] - 1 if b["peak_kb"] else 0.0
+            d_speed, d_mem = f"{speed:+.0%}", f"{mem:+.0%}"
+            if speed < -tolerance or mem > tolerance:
+                regressions.append(name)
+        print(f"{name:18s} {r['items']:7d} {r['per_sec']:12.1f} {d_speed:>8s} {r['peak_kb']:9.0f}KB {d_mem:>8s}")
+    return regressions
+
+def bench_suite(args):
+    fixture_dir = pathlib.Path(args.fixtures).resolve() if args.fixtures else None
+    baseline_path = pathlib.Path(args.baseline).resolve()
+    fixtures = load_fixtures(fixture_dir)
+    cwd = os.getcwd()
+    results: Dict[str, Dict] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = pathlib.Path(tmp)
+        isolated_state(workdir)
+        try:
+            for name, fn in suite_benchmarks(fixtures, workdir, args.posts).items():
+                results[name] = measure(fn, args.repeat)
+            source, servers, gather = gather_benchmark(fixture_dir, workdir)
+            results["gather_all_posts"] = measure(gather, args.repeat)
+            for s in servers:
+                s.shutdown()
+        finally:
+            os.chdir(cwd)
+    if args.compose:
+        posted, times = compose_times(args.compose, 0)
+        results["compose"] = {"items": posted, "seconds": sum(times), "per_sec": posted / sum(times), "peak_kb": 0.0}
+
+    baseline = None
+    if baseline_path.exists():
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("source") != source:
+            print(f"Baseline dari sumber lain ({baseline.get('source')} vs {source}), tidak dibandingkan.")
+            baseline = None
+    print(f"sumber gather_all_posts: {source}, {len(fixtures)} halaman fixture, {args.posts} post sintetis")
+    regressions = print_report(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump({"source": source, "saved_at": int(time.time()), "results": results}, f, indent=2)
+        print(f"Baseline disimpan ke {baseline_path}")
+    elif baseline is None:
+        print(f"Belum ada baseline di {baseline_path}; simpan dengan --save-baseline.")
+    if regressions and not args.save_baseline:
+        print(f"REGRESI (> {args.tolerance:.0%}): {', '.join(regressions)}")
+        return 1
+    return 0
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("fetch", help="bandingkan scrape serial vs paralel")
+    p.add_argument("--domains", type=int, default=4)
+    p.add_argument("--pages", type=int, default=bot.MAX_PAGES_PER_SITE, help="jumlah halaman yang ada per situs")
+    p.add_argument("--latency", type=float, default=0.05)
+    p.add_argument("--rest-domains", type=int, default=0, help="jumlah situs load-more yang punya REST WordPress")
+    p.set_defaults(func=bench_fetch)
+    p = sub.add_parser("parse", help="bandingkan parse_posts lama vs baru pada fixture HTML")
+    p.add_argument("--fixtures", help="folder berisi file .html (default: fixture sintetis)")
+    p.add_argument("--repeat", type=int, default=20)
+    p.set_defaults(func=bench_parse)
+    p = sub.add_parser("compose", help="ukur overhead posting per tweet pada tiruan composer X")
+    p.add_argument("--tweets", type=int, default=10)
+    p.add_argument("--latency-ms", type=int, default=300)
+    p.set_defaults(func=bench_compose)
+    p = sub.add_parser("record", help="rekam halaman kategori asli (online) untuk diputar ulang offline")
+    p.add_argument("--out", default=str(RECORDED_DIR))
+    p.add_argument("--pages", type=int, default=bot.MAX_PAGES_PER_SITE)
+    p.set_defaults(func=bench_record)
+    p = sub.add_parser("suite", help="benchmark regresi (throughput + memori) dibanding baseline")
+    p.add_argument("--fixtures", default=str(RECORDED_DIR) if (RECORDED_DIR / "index.json").exists() else None,
+                   help="folder hasil `record` (default: rekaman bawaan kalau ada, selain itu data sintetis)")
+    p.add_argument("--baseline", default=str(BASELINE_JSON))
+    p.add_argument("--save-baseline", action="store_true", help="simpan hasil run ini sebagai baseline baru")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--posts", type=int, default=20000, help="jumlah post sintetis untuk dedupe/build_queue/antrean")
+    p.add_argument("--tolerance", type=float, default=0.2, help="batas penurunan throughput/kenaikan memori")
+    p.add_argument("--compose", type=int, default=0, help="ikut ukur N tweet di tiruan composer X (butuh Chrome)")
+    p.set_defaults(func=bench_suite)
+    args = ap.parse_args(argv)
+    logging.getLogger().setLevel(logging.WARNING)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
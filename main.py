@@ -5,31 +5,51 @@
 BOT TWEET OTOMATIS TANPA API (POST DARI HALAMAN HOME)
 =====================================================
 + Tambahan fitur:
-  - Menyimpan antrean tweet ke `queue.json` supaya bisa lanjut walau script mati.
+  - Menyimpan antrean tweet ke `data/queue.journal` supaya bisa lanjut walau script mati.
   - Saat start, tanya mau reset progress atau tidak.
+  - Mode daemon (`python main.py daemon`): scrape berkala di latar belakang sambil posting, tanpa input().
+  - `python main.py status` / `enqueue`: lihat dan ubah antrean/riwayat tanpa memuat Selenium.
 """
 
+from __future__ import annotations
+
 import os
 import re
+import sys
 import time
 import json
 import random
+import struct
+import functools
 import hashlib
 import logging
 import pathlib
-from typing import List, Dict, Tuple, Set
-
-import requests
-from bs4 import BeautifulSoup
-
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import TimeoutException, InvalidSessionIdException, NoSuchElementException
+import sqlite3
+import html as htmllib
+from urllib.parse import urlencode, urlsplit, urlunsplit, parse_qsl
+import shutil
+import signal
+import argparse
+import cProfile
+import tempfile
+import threading
+from collections import deque, Counter
+from contextlib import contextmanager, nullcontext
+from queue import Queue
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, Set, Optional, Container, Iterable, Iterator, NamedTuple, FrozenSet, TYPE_CHECKING
+
+# requests, lxml, dan selenium baru di-import di fungsi yang memakainya, jadi perintah yang
+# cuma menyentuh antrean/riwayat (status, enqueue, lanjut antrean) start cepat dan hemat RAM
+if TYPE_CHECKING:
+    import requests
+    from selenium import webdriver
+
+# nilai By.CSS_SELECTOR / By.XPATH, ditulis langsung supaya daftar selector tidak butuh selenium
+BY_CSS = "css selector"
+BY_XPATH = "xpath"
 
 #########################
 # KONFIGURASI UTAMA
@@ -37,43 +57,53 @@ from selenium.common.exceptions import TimeoutException, InvalidSessionIdExcepti
 MAX_PAGES_PER_SITE = 10
 DELAY_TWEET_RANGE = (10, 30)
 TWEETS_BEFORE_HOME = 3
+MAX_CONCURRENT_FETCHES = 8   # batas request HTTP paralel secara global
+MAX_FETCHES_PER_DOMAIN = 2   # batas request paralel ke satu domain, biar situs nggak kebanjiran
+SELENIUM_POOL_SIZE = 0       # jumlah Chrome headless paralel untuk situs load-more, 0 = otomatis
+SELENIUM_DRIVER_MEM_MB = 400 # perkiraan RAM per Chrome headless, untuk menghitung ukuran pool otomatis
+INCREMENTAL_SCRAPE = True    # scrape ulang berhenti begitu ketemu postingan yang sudah dikenal
+QUEUE_BUILD_LIMIT = 0        # maks tweet artikel per build antrean (sampel acak dari arsip), 0 = semua
+# judul dianggap duplikat kalau kemiripan Jaccard kata >= ini, 0 = nonaktif. Jangan terlalu rendah:
+# "Paket Umroh Plus Turki 12 Hari" vs "... Dubai 12 Hari" cuma beda satu kata (0.71) tapi artikel lain
+NEAR_DUP_THRESHOLD = 0.85
+
+# penjadwal posting
+# 0 = tanpa batas (cukup jeda DELAY_TWEET_RANGE); isi kalau akun perlu dibatasi, mis. 20/jam 150/hari
+POST_LIMIT_PER_HOUR = 0
+POST_LIMIT_PER_DAY = 0
+POSTING_WINDOWS: List[Tuple[str, str]] = []   # mis. [("07:00", "22:30")], kosong = kapan saja
+SAME_DOMAIN_GAP = 3          # minimal selang (jumlah tweet) antar dua tweet dari domain yang sama
+RATE_LIMIT_BACKOFF = 2.0     # delay dikali segini tiap ada tanda rate limit
+RATE_LIMIT_MAX_FACTOR = 16.0
+RATE_LIMIT_RECOVERY = 0.85   # faktor delay turun pelan-pelan tiap tweet sukses
+
+# mode daemon (`python main.py daemon`), bisa ditimpa lewat daemon.json atau flag CLI
+DAEMON_SCRAPE_INTERVAL = 6 * 3600  # detik antar scrape ulang di latar belakang
+DAEMON_IDLE_POLL = 60        # detik, cek ulang antrean kalau sedang kosong
+INTERACTIVE = True           # False -> tidak pernah input(); belum login langsung error
+POST_HEADLESS = False        # Chrome posting headless (profil harus sudah login)
 
 OUTPUT_DIR = pathlib.Path("./data")
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-POSTS_JSON = OUTPUT_DIR / "posts.json"
-POSTED_TXT = OUTPUT_DIR / "posted.txt"
-QUEUE_JSON = OUTPUT_DIR / "queue.json"
+POSTS_JSON = OUTPUT_DIR / "posts.json"       # format lama, hanya dibaca untuk migrasi
+POSTS_DIR = OUTPUT_DIR / "posts"             # arsip postingan, satu file JSONL per domain
+POSTED_TXT = OUTPUT_DIR / "posted.txt"       # format lama, hanya dibaca untuk migrasi
+POSTED_DB = OUTPUT_DIR / "posted.db"
+QUEUE_JSON = OUTPUT_DIR / "queue.json"       # format lama, hanya dibaca untuk migrasi
+QUEUE_JOURNAL = OUTPUT_DIR / "queue.journal"
+QUEUE_COMPACT_EVERY = 50   # tulis ulang journal setiap sekian tweet selesai
+SCHEDULER_JSON = OUTPUT_DIR / "scheduler.json"
 CHROME_PROFILE_DIR = pathlib.Path("./chrome_profile")
-CHROME_PROFILE_DIR.mkdir(exist_ok=True)
 HOME_TWEET_FILE = pathlib.Path("./home_tweet.txt")
+# multi-akun (opsional): [{"name": "akun1", "profile_dir": "./chrome_profile_akun1"}, ...]
+# per akun boleh ditambah "per_hour", "per_day", "windows", "headless" untuk menimpa setelan global
+ACCOUNTS_JSON = pathlib.Path("./accounts.json")
+DEFAULT_ACCOUNT = "default"
+DAEMON_JSON = pathlib.Path("./daemon.json")
+CHROMEDRIVER_CACHE = OUTPUT_DIR / "chromedriver_path.txt"
+SITE_PROFILES_JSON = OUTPUT_DIR / "site_profiles.json"   # hasil deteksi otomatis per domain
 
-CATEGORIES: List[str] = [
-    "https://tatarapilaundry.com/category/blog/",
-    "https://villapermatagroup.com/category/artikel",
-    "https://batikputrabengawan.co.id/category/batik/",
-    "https://www.altembaga.com/category/artikel/",
-    "https://mganik-nutrition.com/category/artikel/",
-    "https://juallonceng.com/category/artikel/",
-    "https://tehnuri.com/category/artikel/",
-    "https://mozapro.id/category/artikel/",
-    "https://kopimaxpresso.com/category/artikel",
-    "https://haidartours.com/category/artikel",
-    "https://laroiba.com/category/artikel",
-    "https://maklonbygujati.id/category/artikel",
-    "https://houseofasiyah.com/category/artikel/",
-    "https://gagahjayaabadi.com/blog/",
-    "https://batikestujaya.com/category/artikel/",
-    "https://khattabatik.com/category/artikel",
-    "https://deonkraft.com/category/artikel/",
-    "https://alphenwear.com/category/artikel/",
-    "https://cvmac.id/category/blog/", # <-- DIKEMBALIKAN KE SINI
-]
-
-LOAD_MORE_DOMAINS: Set[str] = {
-    "villapermatagroup.com",
-    "houseofasiyah.com",
-    "haidartours.com",
-}
+# daftar situs sumber artikel beserta cara scrape-nya, format entri lihat load_sites()
+SITES_JSON = pathlib.Path("./sites.json")
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 
@@ -88,31 +118,816 @@ def domain_of(url: str) -> str:
 
 def rand_delay(a: int, b: int):
     t = random.uniform(a, b)
-    logging.info(f"Delay {t:.2f} detik...")
+    logging.debug(f"Delay {t:.2f} detik...")
     time.sleep(t)
 
-def load_posted() -> Set[str]:
-    if POSTED_TXT.exists():
-        with open(POSTED_TXT, "r", encoding="utf-8") as f:
-            return set(line.strip() for line in f if line.strip())
-    return set()
-
-def save_posted(items: List[str]):
-    with open(POSTED_TXT, "a", encoding="utf-8") as f:
-        for it in items:
-            f.write(it + "\n")
+def ensure_dirs():
+    # dipanggil oleh perintah yang menulis data atau membuka Chrome, bukan saat import
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    CHROME_PROFILE_DIR.mkdir(exist_ok=True)
 
 def text_hash(txt: str) -> str:
     return hashlib.sha1(txt.encode("utf-8")).hexdigest()
 
-# Perbaikan pada fungsi safe_get
-def safe_get(url: str, timeout: int = 20) -> requests.Response:
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122 Safari/537.36",
-        "Accept-Language": "id,en;q=0.9",
+class AnyOf:
+    """Gabungan beberapa container untuk cek `in` tanpa menyalin isinya."""
+
+    def __init__(self, *containers: Container[str]):
+        self.containers = containers
+
+    def __contains__(self, item) -> bool:
+        return any(item in c for c in self.containers)
+
+class JsonProfiles:
+    """File JSON kecil berisi data per kunci (domain/URL), dimuat sekali lalu ditulis ulang atomik."""
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data: Optional[Dict[str, Dict]] = None
+
+    def _load(self) -> Dict[str, Dict]:
+        if self.data is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.data = json.load(f)
+            except (IOError, ValueError):
+                self.data = {}
+        return self.data
+
+    def get(self, key: str) -> Dict:
+        with self.lock:
+            return dict(self._load().get(key) or {})
+
+    def set(self, key: str, **values):
+        with self.lock:
+            self._load()[key] = dict(values, checked_at=int(time.time()))
+            self._save()
+
+    def update(self, key: str, **values):
+        # seperti set(), tapi kolom lain milik kunci ini dipertahankan
+        with self.lock:
+            data = self._load()
+            data[key] = dict(data.get(key) or {}, **values, checked_at=int(time.time()))
+            self._save()
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+#########################
+# METRIK
+#########################
+METRICS_PROM = OUTPUT_DIR / "metrics.prom"   # format teks Prometheus (cocok untuk textfile collector)
+METRICS_JSON = OUTPUT_DIR / "metrics.json"
+METRICS_PREFIX = "tweetbot_"
+PROFILER: Optional[str] = None   # None, "cprofile", atau "pyinstrument" (lewat --profile)
+
+def _label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _prom_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _prom_labels(key: Tuple[Tuple[str, str], ...]) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{_prom_escape(v)}"' for k, v in key) + "}"
+
+class Metrics:
+    """Counter, gauge, dan timer berlabel yang thread-safe, diekspor ke teks Prometheus dan JSON."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.export_lock = threading.Lock()   # worker posting & thread refresh bisa export bersamaan
+        self.counters: Dict[str, Dict[Tuple, float]] = {}
+        self.gauges: Dict[str, Dict[Tuple, float]] = {}
+        self.timers: Dict[str, Dict[Tuple, List[float]]] = {}   # [jumlah, total detik, maks detik]
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _label_key(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        with self.lock:
+            self.gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = _label_key(labels)
+        with self.lock:
+            st = self.timers.setdefault(name, {}).setdefault(key, [0, 0.0, 0.0])
+            st[0] += 1
+            st[1] += seconds
+            st[2] = max(st[2], seconds)
+
+    @contextmanager
+    def timed(self, name: str, **labels):
+        # bisa dipakai sebagai `with` atau dekorator
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0, **labels)
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.timers.clear()
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {
+                "counters": {n: [{"labels": dict(k), "value": v} for k, v in s.items()] for n, s in self.counters.items()},
+                "gauges": {n: [{"labels": dict(k), "value": v} for k, v in s.items()] for n, s in self.gauges.items()},
+                "timers": {
+                    n: [{"labels": dict(k), "count": c, "sum": t, "max": m} for k, (c, t, m) in s.items()]
+                    for n, s in self.timers.items()
+                },
+            }
+
+    def prometheus(self) -> str:
+        lines: List[str] = []
+        with self.lock:
+            for name, series in sorted(self.counters.items()):
+                full = METRICS_PREFIX + name
+                lines.append(f"# TYPE {full} counter")
+                lines += [f"{full}{_prom_labels(k)} {v}" for k, v in sorted(series.items())]
+            for name, series in sorted(self.gauges.items()):
+                full = METRICS_PREFIX + name
+                lines.append(f"# TYPE {full} gauge")
+                lines += [f"{full}{_prom_labels(k)} {v}" for k, v in sorted(series.items())]
+            for name, series in sorted(self.timers.items()):
+                full = METRICS_PREFIX + name
+                lines.append(f"# TYPE {full} summary")
+                for k, (c, t, m) in sorted(series.items()):
+                    lines.append(f"{full}_count{_prom_labels(k)} {c}")
+                    lines.append(f"{full}_sum{_prom_labels(k)} {t:.6f}")
+                lines.append(f"# TYPE {full}_max gauge")
+                lines += [f"{full}_max{_prom_labels(k)} {m:.6f}" for k, (_, _, m) in sorted(series.items())]
+        return "\n".join(lines) + "\n"
+
+    def export(self, prom_path: pathlib.Path = METRICS_PROM, json_path: pathlib.Path = METRICS_JSON):
+        # ditulis atomik supaya scraper Prometheus tidak pernah membaca file setengah jadi
+        data = {"updated_at": int(time.time()), **self.snapshot()}
+        with self.export_lock:
+            for path, content in ((prom_path, self.prometheus()), (json_path, json.dumps(data, ensure_ascii=False, indent=2))):
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(path.suffix + ".tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(content)
+                os.replace(tmp, path)
+
+METRICS = Metrics()
+
+@contextmanager
+def profiled(stage: str):
+    # profil opsional per tahap (thread pemanggil saja), hasilnya di data/profile_<tahap>.*
+    if PROFILER == "cprofile":
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            out = OUTPUT_DIR / f"profile_{stage}.pstats"
+            prof.dump_stats(str(out))
+            logging.info(f"[profile] {stage} -> {out} (buka dengan `python -m pstats`)")
+    elif PROFILER == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logging.warning("pyinstrument belum terpasang (pip install pyinstrument), profil dilewati.")
+            yield
+            return
+        prof = Profiler()
+        prof.start()
+        try:
+            yield
+        finally:
+            prof.stop()
+            out = OUTPUT_DIR / f"profile_{stage}.html"
+            out.write_text(prof.output_html(), encoding="utf-8")
+            logging.info(f"[profile] {stage} -> {out}")
+    else:
+        yield
+
+#########################
+# DEDUPE KONTEN
+#########################
+URL_RE = re.compile(r'https?://[^\s]+')
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid", "ref", "_ga"}
+
+def canonical_url(url: str) -> str:
+    # bentuk baku untuk membandingkan URL: https, host kecil tanpa www, tanpa fragment,
+    # tanpa parameter pelacak, query diurutkan, tanpa slash di akhir path
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+# MinHash di atas himpunan kata judul + LSH banding: judul yang mirip hampir pasti punya minimal
+# satu band yang sama persis, jadi cukup lookup per band lalu hitung Jaccard pada kandidatnya,
+# tanpa membandingkan dengan seluruh riwayat. Jangan ubah angka ini setelah ada riwayat.
+MINHASH_PERMS = 32
+MINHASH_BANDS = 8            # 8 band x 4 baris: Jaccard 0.7 ketemu ~89%, 0.85 ~99.7%
+MINHASH_MIN_TOKENS = 4       # judul terlalu pendek tidak dicek kemiripannya (cukup URL/teks persis)
+_MINHASH_ROW = struct.Struct(f"<{MINHASH_PERMS}H")   # MinHash 16-bit per permutasi (b-bit MinHash)
+
+class TitleKey(NamedTuple):
+    tokens: FrozenSet[str]
+    bands: Tuple[int, ...]
+    threshold: float = 1.0   # batas Jaccard saat kunci ini dicek dengan `in` (lihat fresh_posts)
+
+def title_tokens(title: str) -> FrozenSet[str]:
+    return frozenset(re.findall(r"\w+", title.lower()))
+
+def title_key(title: str, threshold: float = 1.0) -> Optional[TitleKey]:
+    tokens = title_tokens(title)
+    if len(tokens) < MINHASH_MIN_TOKENS:
+        return None
+    # tiap potongan 16-bit dari digest BLAKE2b satu kata = satu fungsi hash independen
+    per_token = [_MINHASH_ROW.unpack(hashlib.blake2b(t.encode("utf-8"), digest_size=_MINHASH_ROW.size).digest())
+                 for t in tokens]
+    sig = list(map(min, *per_token))
+    rows = MINHASH_PERMS // MINHASH_BANDS
+    # kunci band: baris-baris 16-bit digabung jadi satu integer 63-bit (muat di kolom INTEGER SQLite)
+    bands = []
+    for i in range(0, MINHASH_PERMS, rows):
+        key = 0
+        for v in sig[i:i + rows]:
+            key = (key << 16) | v
+        bands.append(key & 0x7FFFFFFFFFFFFFFF)
+    return TitleKey(tokens, tuple(bands), threshold)
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+class TitleIndex:
+    """Indeks LSH judul di memori; `key in index` True kalau ada judul yang mirip (>= key.threshold)."""
+
+    def __init__(self):
+        self.buckets: List[Dict[int, List[FrozenSet[str]]]] = [{} for _ in range(MINHASH_BANDS)]
+
+    def add(self, key: Optional[TitleKey]):
+        if key is None:
+            return
+        for bucket, band in zip(self.buckets, key.bands):
+            bucket.setdefault(band, []).append(key.tokens)
+
+    def __contains__(self, key) -> bool:
+        if not isinstance(key, TitleKey):
+            return False
+        for bucket, band in zip(self.buckets, key.bands):
+            if any(jaccard(key.tokens, other) >= key.threshold for other in bucket.get(band, ())):
+                return True
+        return False
+
+#########################
+# RIWAYAT POSTING
+#########################
+_HEX40 = re.compile(r"^[0-9a-f]{40}$")
+
+class PostedHistory:
+    """
+    Riwayat yang sudah diposting di SQLite. Isinya sama dengan posted.txt dulu (URL dan
+    text_hash), tapi disimpan sebagai digest SHA-1 20 byte: text_hash langsung dari hex-nya,
+    URL/teks lain di-hash dulu. Cek `in` cukup satu lookup primary key, tanpa memuat semuanya.
+    read_only=True (mis. `status`) membuka DB yang sudah ada tanpa membuat tabel, migrasi, atau menulis.
+    """
+
+    def __init__(self, path: pathlib.Path = POSTED_DB, read_only: bool = False):
+        self.path = path
+        self.read_only = read_only
+        self.lock = threading.Lock()
+        if read_only:
+            self.db = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS posted ("
+            " digest BLOB PRIMARY KEY, kind TEXT NOT NULL, domain TEXT, posted_at INTEGER NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS posted_domain ON posted(domain)")
+        # judul yang sudah diposting: kata-katanya + kunci band MinHash (satu kolom terindeks per band)
+        band_cols = ", ".join(f"b{i} INTEGER NOT NULL" for i in range(MINHASH_BANDS))
+        self.db.execute(
+            f"CREATE TABLE IF NOT EXISTS titles (tokens TEXT NOT NULL, {band_cols}, posted_at INTEGER NOT NULL)"
+        )
+        for i in range(MINHASH_BANDS):
+            self.db.execute(f"CREATE INDEX IF NOT EXISTS titles_b{i} ON titles(b{i})")
+        self.db.commit()
+        self._migrate_txt()
+
+    @staticmethod
+    def _row(item: str, now: int) -> Tuple[bytes, str, Optional[str], int]:
+        if _HEX40.match(item):
+            return bytes.fromhex(item), "text", None, now
+        if item.startswith(("http://", "https://")):
+            return hashlib.sha1(item.encode("utf-8")).digest(), "url", domain_of(item), now
+        return hashlib.sha1(item.encode("utf-8")).digest(), "raw", None, now
+
+    def _migrate_txt(self):
+        # posted.txt ikut disimpan dengan bentuk kanonik URL-nya (user_version 1); riwayat yang
+        # dimigrasi sebelum ada URL kanonik dilengkapi sekali dari posted.txt.migrated. DB baru
+        # (instal baru atau habis reset) tidak diisi dari situ, cukup ditandai versi 1.
+        migrated = POSTED_TXT.with_suffix(".txt.migrated")
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if POSTED_TXT.exists():
+            source = POSTED_TXT
+        elif version < 1 and migrated.exists() and len(self):
+            source = migrated
+        else:
+            source = None
+        if source is not None:
+            with open(source, "r", encoding="utf-8") as f:
+                lines = [line.strip() for line in f if line.strip()]
+            self.add_many(lines + [canonical_url(u) for u in lines if u.startswith(("http://", "https://"))])
+        if version < 1:
+            self.db.execute("PRAGMA user_version = 1")
+            self.db.commit()
+        if source is POSTED_TXT:
+            POSTED_TXT.rename(migrated)
+            logging.info(f"Riwayat {POSTED_TXT} dipindah ke {self.path} ({len(self)} entri)")
+        elif source is not None:
+            logging.info(f"URL kanonik riwayat lama dilengkapi dari {migrated} ({len(self)} entri)")
+
+    def __contains__(self, item) -> bool:
+        if isinstance(item, TitleKey):
+            return self._similar_title(item)
+        if not isinstance(item, str) or not item:
+            return False
+        digest = self._row(item, 0)[0]
+        with self.lock:
+            return self.db.execute("SELECT 1 FROM posted WHERE digest = ?", (digest,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM posted").fetchone()[0]
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        with self.lock:
+            entries, last = self.db.execute("SELECT COUNT(*), MAX(posted_at) FROM posted").fetchone()
+            # DB lama yang belum dibuka versi ini belum punya tabel titles (read_only tidak membuatnya)
+            has_titles = self.db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'titles'").fetchone()
+            titles = self.db.execute("SELECT COUNT(*) FROM titles").fetchone()[0] if has_titles else 0
+        return {"entries": entries, "titles": titles, "last_posted_at": last}
+
+    def add_many(self, items):
+        if self.read_only:
+            raise RuntimeError("PostedHistory read_only tidak boleh ditulis")
+        now = int(time.time())
+        rows = [self._row(it, now) for it in items if it]
+        if not rows:
+            return
+        with self.lock:
+            with self.db:
+                self.db.executemany("INSERT OR IGNORE INTO posted VALUES (?, ?, ?, ?)", rows)
+
+    def _similar_title(self, key: TitleKey) -> bool:
+        where = " OR ".join(f"b{i} = ?" for i in range(MINHASH_BANDS))
+        with self.lock:
+            rows = self.db.execute(f"SELECT tokens FROM titles WHERE {where}", key.bands).fetchall()
+        return any(jaccard(key.tokens, frozenset(tokens.split())) >= key.threshold for tokens, in rows)
+
+    def add_titles(self, titles: Iterable[str]):
+        if self.read_only:
+            raise RuntimeError("PostedHistory read_only tidak boleh ditulis")
+        now = int(time.time())
+        rows = []
+        for title in titles:
+            key = title_key(title)
+            if key is not None:
+                rows.append((" ".join(sorted(key.tokens)), *key.bands, now))
+        if not rows:
+            return
+        marks = ", ".join("?" * (MINHASH_BANDS + 2))
+        with self.lock:
+            with self.db:
+                self.db.executemany(f"INSERT INTO titles VALUES ({marks})", rows)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+_posted_history: Optional[PostedHistory] = None
+
+def posted_history() -> PostedHistory:
+    global _posted_history
+    if _posted_history is None:
+        _posted_history = PostedHistory()
+    return _posted_history
+
+def reset_posted():
+    global _posted_history
+    if _posted_history is not None:
+        _posted_history.close()
+        _posted_history = None
+    for path in (POSTED_TXT, POSTED_DB, POSTED_DB.with_name(POSTED_DB.name + "-wal"), POSTED_DB.with_name(POSTED_DB.name + "-shm")):
+        path.unlink(missing_ok=True)
+
+def load_posted() -> PostedHistory:
+    return posted_history()
+
+def save_posted(items: List[str]):
+    posted_history().add_many(items)
+
+def tweet_keys(text: str) -> List[str]:
+    # kunci riwayat satu tweet: URL apa adanya + bentuk kanonik, dan hash teks
+    urls = URL_RE.findall(text)
+    return urls + [canonical_url(u) for u in urls] + [text_hash(text)]
+
+def record_posted(text: str):
+    # catat tweet yang terkirim: kunci dari tweet_keys() dan judulnya
+    save_posted(tweet_keys(text))
+    title = URL_RE.sub("", text).strip()
+    if title:
+        posted_history().add_titles([title])
+
+#########################
+# HTTP CLIENT
+#########################
+HTTP_POOL_SIZE = 4            # koneksi keep-alive per domain
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_BASE = 1.0       # detik, dikali 2^percobaan lalu di-jitter
+HTTP_BACKOFF_MAX = 30.0
+HTTP_RETRY_AFTER_MAX = 120.0  # batas atas Retry-After dari server
+HTTP_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122 Safari/537.36",
+    "Accept-Language": "id,en;q=0.9",
+}
+
+# waktu connect dicatat per thread oleh koneksi urllib3 di bawah
+_conn_timing = threading.local()
+
+@functools.lru_cache(maxsize=None)
+def _timed_adapter_cls():
+    # kelas turunan urllib3/requests dibuat saat sesi HTTP pertama, bukan saat import
+    import urllib3
+    from requests.adapters import HTTPAdapter
+
+    class _TimedHTTPConnection(urllib3.connection.HTTPConnection):
+        def connect(self):
+            t0 = time.perf_counter()
+            super().connect()
+            _conn_timing.connect = getattr(_conn_timing, "connect", 0.0) + time.perf_counter() - t0
+
+    class _TimedHTTPSConnection(urllib3.connection.HTTPSConnection):
+        def connect(self):
+            t0 = time.perf_counter()
+            super().connect()
+            _conn_timing.connect = getattr(_conn_timing, "connect", 0.0) + time.perf_counter() - t0
+
+    class _TimedHTTPPool(urllib3.HTTPConnectionPool):
+        ConnectionCls = _TimedHTTPConnection
+
+    class _TimedHTTPSPool(urllib3.HTTPSConnectionPool):
+        ConnectionCls = _TimedHTTPSConnection
+
+    class _TimedAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPPool, "https": _TimedHTTPSPool}
+
+    return _TimedAdapter
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+def get_session(dom: str) -> requests.Session:
+    import requests
+    with _sessions_lock:
+        sess = _sessions.get(dom)
+        if sess is None:
+            sess = requests.Session()
+            sess.headers.update(HTTP_HEADERS)
+            adapter = _timed_adapter_cls()(pool_connections=2, pool_maxsize=HTTP_POOL_SIZE)
+            sess.mount("http://", adapter)
+            sess.mount("https://", adapter)
+            _sessions[dom] = sess
+        return sess
+
+def close_sessions():
+    with _sessions_lock:
+        for sess in _sessions.values():
+            sess.close()
+        _sessions.clear()
+
+# statistik per domain: jumlah request, retry, error, dan total waktu connect/TTFB/total
+FETCH_STATS: Dict[str, Dict[str, float]] = {}
+_fetch_stats_lock = threading.Lock()
+
+def _record_fetch(dom: str, **values: float):
+    with _fetch_stats_lock:
+        st = FETCH_STATS.setdefault(dom, {
+            "requests": 0, "retries": 0, "errors": 0, "cache_hits": 0,
+            "connect": 0.0, "ttfb": 0.0, "total": 0.0, "max_total": 0.0,
+        })
+        for k, v in values.items():
+            st[k] += v
+        if "total" in values:
+            st["max_total"] = max(st["max_total"], values["total"])
+    # salinan ke METRICS: hitungan jadi counter, waktu jadi timer per domain
+    for k, v in values.items():
+        if k in ("connect", "ttfb", "total"):
+            METRICS.observe(f"http_{k}_seconds", v, domain=dom)
+        else:
+            METRICS.inc(f"http_{k}_total", v, domain=dom)
+
+def fetch_stats_report():
+    with _fetch_stats_lock:
+        rows = sorted(FETCH_STATS.items(), key=lambda kv: kv[1]["total"] / max(kv[1]["requests"], 1), reverse=True)
+    logging.info(f"[http] Total {int(sum(st['requests'] for _, st in rows))} request ke {len(rows)} domain")
+    for dom, st in rows:
+        n = max(st["requests"], 1)
+        logging.info(
+            f"[http] {dom}: {int(st['requests'])} req, {int(st['cache_hits'])} cache hit, "
+            f"{int(st['retries'])} retry, {int(st['errors'])} error | "
+            f"connect {st['connect'] / n * 1000:.0f}ms, TTFB {st['ttfb'] / n * 1000:.0f}ms, "
+            f"total {st['total'] / n * 1000:.0f}ms (maks {st['max_total'] * 1000:.0f}ms)"
+        )
+
+def _retry_after(resp: requests.Response):
+    val = resp.headers.get("Retry-After")
+    if not val:
+        return None
+    try:
+        secs = float(val)
+    except ValueError:
+        try:
+            secs = (parsedate_to_datetime(val) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(secs, 0.0), HTTP_RETRY_AFTER_MAX)
+
+def _backoff(attempt: int) -> float:
+    # full jitter: acak di antara 0 dan batas eksponensial
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+def safe_get(url: str, timeout: int = 20, headers: Optional[Dict[str, str]] = None,
+             slot=None) -> requests.Response:
+    # slot(url): context manager yang dipegang hanya selama satu percobaan request,
+    # jadi tidur backoff/Retry-After tidak menahan slot fetch (lihat limited_get)
+    import requests
+    dom = domain_of(url)
+    sess = get_session(dom)
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        try:
+            with slot(url) if slot else nullcontext():
+                _conn_timing.connect = 0.0
+                t0 = time.perf_counter()
+                resp = sess.get(url, timeout=timeout, headers=headers, stream=True)
+                ttfb = time.perf_counter() - t0
+                resp.content  # baca body sekarang supaya waktu total tercatat
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt >= HTTP_MAX_RETRIES:
+                _record_fetch(dom, errors=1)
+                raise
+            wait = _backoff(attempt)
+            logging.warning(f"[http] {url}: {e.__class__.__name__}, coba lagi dalam {wait:.1f} detik")
+            _record_fetch(dom, retries=1)
+            time.sleep(wait)
+            continue
+        total = time.perf_counter() - t0
+        _record_fetch(dom, requests=1, connect=_conn_timing.connect, ttfb=ttfb, total=total)
+        if resp.status_code in HTTP_RETRY_STATUS and attempt < HTTP_MAX_RETRIES:
+            wait = _retry_after(resp)
+            if wait is None:
+                wait = _backoff(attempt)
+            logging.warning(f"[http] {url}: status {resp.status_code}, coba lagi dalam {wait:.1f} detik")
+            _record_fetch(dom, retries=1)
+            time.sleep(wait)
+            continue
+        return resp
+
+#########################
+# FETCH PARALEL
+#########################
+_fetch_slots = threading.BoundedSemaphore(MAX_CONCURRENT_FETCHES)
+_domain_slots: Dict[str, threading.BoundedSemaphore] = {}
+_domain_limits: Dict[str, int] = {}   # batas per domain dari sites.json, selain itu MAX_FETCHES_PER_DOMAIN
+_domain_slots_lock = threading.Lock()
+
+def set_fetch_limits(max_total: int = MAX_CONCURRENT_FETCHES, max_per_domain: int = MAX_FETCHES_PER_DOMAIN):
+    global _fetch_slots, MAX_CONCURRENT_FETCHES, MAX_FETCHES_PER_DOMAIN
+    MAX_CONCURRENT_FETCHES = max(1, max_total)
+    MAX_FETCHES_PER_DOMAIN = max(1, max_per_domain)
+    _fetch_slots = threading.BoundedSemaphore(MAX_CONCURRENT_FETCHES)
+    with _domain_slots_lock:
+        _domain_slots.clear()
+
+def set_domain_limit(dom: str, limit: int):
+    with _domain_slots_lock:
+        limit = max(1, limit)
+        if _domain_limits.get(dom) != limit:
+            _domain_limits[dom] = limit
+            _domain_slots.pop(dom, None)
+
+def domain_limit(dom: str) -> int:
+    with _domain_slots_lock:
+        return _domain_limits.get(dom, MAX_FETCHES_PER_DOMAIN)
+
+def domain_slot(dom: str) -> threading.BoundedSemaphore:
+    with _domain_slots_lock:
+        slot = _domain_slots.get(dom)
+        if slot is None:
+            slot = _domain_slots[dom] = threading.BoundedSemaphore(_domain_limits.get(dom, MAX_FETCHES_PER_DOMAIN))
+        return slot
+
+@contextmanager
+def fetch_slot(url: str):
+    # slot domain diambil dulu supaya slot global tidak ditahan selagi antre per-domain
+    with domain_slot(domain_of(url)):
+        with _fetch_slots:
+            yield
+
+def limited_get(url: str, timeout: int = 20, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    return safe_get(url, timeout, headers, slot=fetch_slot)
+
+#########################
+# CACHE HTTP (CONDITIONAL GET)
+#########################
+HTTP_CACHE_DIR = OUTPUT_DIR / "http_cache"
+HTTP_CACHE_MAX_AGE_DAYS = 14              # entri yang tidak dipakai selama ini dibuang
+HTTP_CACHE_MAX_BYTES = 20 * 1024 * 1024   # total ukuran cache maksimal
+
+def _cache_path(url: str) -> pathlib.Path:
+    return HTTP_CACHE_DIR / (text_hash(url) + ".json")
+
+def http_cache_get(url: str) -> Optional[Dict]:
+    path = _cache_path(url)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (IOError, ValueError):
+        return None
+    return entry if entry.get("url") == url else None
+
+def http_cache_put(url: str, resp: requests.Response, body_hash: str, posts: List[Tuple[str, str]]):
+    HTTP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    entry = {
+        "url": url,
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+        "hash": body_hash,
+        "posts": posts,
     }
-    # Tambahkan verify=False untuk mengabaikan kesalahan SSL
-    return requests.get(url, headers=headers, timeout=timeout)
+    path = _cache_path(url)
+    tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def prune_http_cache():
+    if not HTTP_CACHE_DIR.exists():
+        return
+    cutoff = time.time() - HTTP_CACHE_MAX_AGE_DAYS * 86400
+    files = []
+    for path in HTTP_CACHE_DIR.glob("*.json"):
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        if st.st_mtime < cutoff:
+            path.unlink(missing_ok=True)
+        else:
+            files.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in files)
+    # kalau masih kebesaran, buang yang paling lama tidak dipakai
+    for _, size, path in sorted(files):
+        if total <= HTTP_CACHE_MAX_BYTES:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+def fetch_page_posts(url: str) -> List[Tuple[str, str]]:
+    # 304 atau body yang sama persis -> pakai hasil parse dari cache, parse_posts dilewati
+    entry = http_cache_get(url)
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    resp = limited_get(url, headers=headers or None)
+    if resp.status_code == 304 and entry:
+        _record_fetch(domain_of(url), cache_hits=1)
+        os.utime(_cache_path(url))
+        return [tuple(p) for p in entry["posts"]]
+    if resp.status_code != 200:
+        return []
+    body_hash = hashlib.sha1(resp.content).hexdigest()
+    if entry and entry.get("hash") == body_hash:
+        _record_fetch(domain_of(url), cache_hits=1)
+        posts = [tuple(p) for p in entry["posts"]]
+    else:
+        posts = parse_posts(resp.text, domain_of(url))
+    http_cache_put(url, resp, body_hash, posts)
+    return posts
+
+#########################
+# REGISTRY SITUS
+#########################
+# "http" = halaman kategori + pagination, "rest" = REST WordPress (cadangan Selenium),
+# "selenium" = klik tombol load-more di Chrome
+SITE_METHODS = ("http", "rest", "selenium")
+SITE_PROFILES = JsonProfiles(SITE_PROFILES_JSON)
+
+class Site(NamedTuple):
+    """Satu situs sumber dari sites.json."""
+    url: str
+    method: str = "http"
+    pagination: Optional[str] = None    # skema pagination tetap, None = deteksi otomatis
+    selector: Optional[str] = None      # selector judul yang dicoba lebih dulu
+    max_pages: int = MAX_PAGES_PER_SITE
+    concurrency: int = MAX_FETCHES_PER_DOMAIN
+
+    @property
+    def domain(self) -> str:
+        return domain_of(self.url)
+
+def load_sites(path: pathlib.Path = SITES_JSON) -> List[Site]:
+    # entri boleh berupa string URL saja, atau objek:
+    # {"url": ..., "method": "http|rest|selenium", "pagination": "path|query", "selector": "h2.judul a",
+    #  "max_pages": 10, "concurrency": 2, "enabled": true}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+    except IOError:
+        logging.warning(f"{path} tidak ditemukan, tidak ada situs untuk di-scrape.")
+        return []
+    _migrate_profiles()
+
+    sites: List[Site] = []
+    seen: Set[str] = set()
+    for i, entry in enumerate(raw):
+        if isinstance(entry, str):
+            entry = {"url": entry}
+        entry = dict(entry)
+        if not entry.pop("enabled", True):
+            continue
+        unknown = set(entry) - set(Site._fields)
+        if unknown:
+            raise ValueError(f"{path} entri #{i}: kolom tidak dikenal {sorted(unknown)}")
+        if not entry.get("url"):
+            raise ValueError(f"{path} entri #{i}: url wajib diisi")
+        site = Site(**entry)
+        if site.method not in SITE_METHODS:
+            raise ValueError(f"{path} entri #{i}: method harus salah satu dari {SITE_METHODS}")
+        if site.pagination is not None and site.pagination not in PAGINATION_SCHEMES:
+            raise ValueError(f"{path} entri #{i}: pagination harus salah satu dari {PAGINATION_SCHEMES}")
+        if site.selector is not None:
+            try:
+                _compile_selector(site.selector)
+            except ValueError as e:
+                raise ValueError(f"{path} entri #{i}: {e}") from None
+        if site.domain in seen:
+            raise ValueError(f"{path} entri #{i}: domain {site.domain} sudah terdaftar")
+        seen.add(site.domain)
+        sites.append(site)
+
+    for site in sites:
+        set_domain_limit(site.domain, site.concurrency)
+        if site.selector and (domain_selectors(site.domain) or [None])[0] != site.selector:
+            learn_selectors(site.domain, [site.selector])
+    return sites
+
+def _migrate_profiles():
+    # pagination.json (per domain) dan wp_rest.json (per URL kategori) digabung ke site_profiles.json
+    for legacy, field in ((PAGINATION_JSON, "pagination"), (WP_REST_JSON, "rest")):
+        if not legacy.exists():
+            continue
+        try:
+            with open(legacy, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (IOError, ValueError):
+            logging.warning(f"{legacy} rusak, tidak dimigrasi.")
+            continue
+        for key, profile in data.items():
+            dom = domain_of(key) if field == "rest" else key
+            if not SITE_PROFILES.get(dom).get(field):
+                SITE_PROFILES.update(dom, **{field: profile})
+        legacy.rename(legacy.with_suffix(".json.migrated"))
+        logging.info(f"Profil {legacy} dipindah ke {SITE_PROFILES.path} ({len(data)} entri)")
 
 #########################
 # SCRAPER
@@ -126,56 +941,268 @@ WP_TITLE_SELECTORS = [
     (".entry-title a", "text", "href"),
 ]
 
-def parse_posts(html: str) -> List[Tuple[str, str]]:
-    soup = BeautifulSoup(html, "lxml")
+# selector di atas dipecah jadi rantai (tag, {class}) supaya semuanya bisa dicocokkan
+# dalam satu kali jalan lewat semua <a>, tanpa CSS engine
+_SELECTOR_PART = re.compile(r"^([a-z0-9]*)((?:\.[\w-]+)*)$")
+
+@functools.lru_cache(maxsize=None)
+def _compile_selector(sel: str) -> List[Tuple[str, Set[str]]]:
+    chain = []
+    for part in sel.split():
+        m = _SELECTOR_PART.match(part)
+        if not m:
+            raise ValueError(f"Selector tidak didukung: {sel}")
+        chain.append((m.group(1), set(c for c in m.group(2).split(".") if c)))
+    return chain
+
+ALL_TITLE_SELECTORS = [sel for sel, _, _ in WP_TITLE_SELECTORS]
+
+# domain -> selector yang terbukti menghasilkan postingan di domain itu (salinan dari site_profiles.json)
+_domain_selectors: Dict[str, Optional[List[str]]] = {}
+_domain_selectors_lock = threading.Lock()
+
+def domain_selectors(dom: Optional[str]) -> Optional[List[str]]:
+    if not dom:
+        return None
+    with _domain_selectors_lock:
+        if dom not in _domain_selectors:
+            _domain_selectors[dom] = SITE_PROFILES.get(dom).get("selectors") or None
+        return _domain_selectors[dom]
+
+def learn_selectors(dom: str, selectors: List[str]):
+    with _domain_selectors_lock:
+        if _domain_selectors.get(dom) == selectors:
+            return
+        _domain_selectors[dom] = selectors
+    SITE_PROFILES.update(dom, selectors=selectors)
+
+def _match_part(el, part: Tuple[str, Set[str]]) -> bool:
+    tag, classes = part
+    if tag and el.tag != tag:
+        return False
+    return not classes or classes.issubset((el.get("class") or "").split())
+
+def _match_chain(el, ancestors: list, chain: List[Tuple[str, Set[str]]]) -> bool:
+    if not _match_part(el, chain[-1]):
+        return False
+    # kombinator descendant: cukup cari leluhur terdekat yang cocok, bagian demi bagian
+    i = len(chain) - 2
+    for node in ancestors:
+        if i < 0:
+            break
+        if _match_part(node, chain[i]):
+            i -= 1
+    return i < 0
+
+def _html_tree(html: str):
+    import lxml.html
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # string dengan deklarasi encoding harus diparse sebagai bytes
+        return lxml.html.document_fromstring(html.encode("utf-8"), parser=lxml.html.HTMLParser(encoding="utf-8"))
+
+_NO_TEXT_TAGS = frozenset({"script", "style", "template"})
+
+def _text(el) -> str:
+    # sama dengan get_text(strip=True) BeautifulSoup: isi script/style/template dan komentar dilewati,
+    # tapi teks sesudahnya (tail) tetap ikut
+    parts: List[str] = []
+    _collect_text(el, parts)
+    return "".join(parts)
+
+def _collect_text(node, parts: List[str]):
+    # urutan dokumen: teks node, lalu tiap anak beserta tail-nya sesudah isi anak itu
+    if not isinstance(node.tag, str) or node.tag in _NO_TEXT_TAGS:
+        return
+    if node.text:
+        parts.append(node.text.strip())
+    for child in node:
+        _collect_text(child, parts)
+        if child.tail:
+            parts.append(child.tail.strip())
+
+def _extract(root, selectors: List[str]) -> List[Tuple[str, str, str]]:
+    chains = [(i, _compile_selector(sel)) for i, sel in enumerate(selectors)]
+    tags = {chain[-1][0] for _, chain in chains}
+    anchors = root.iter(*tags) if "" not in tags else root.iter()
+    found = []
+    for pos, el in enumerate(anchors):
+        if not isinstance(el.tag, str):
+            continue
+        ancestors = list(el.iterancestors())
+        idx = next((i for i, chain in chains if _match_chain(el, ancestors, chain)), None)
+        if idx is None:
+            continue
+        title = _text(el)
+        href = el.get("href")
+        if title and href:
+            found.append((idx, pos, title, href))
+    # urutan hasil sama dengan menjalankan selector satu per satu: per selector, lalu urutan dokumen
+    found.sort(key=lambda x: (x[0], x[1]))
     seen = set()
+    results = []
+    for idx, _, title, href in found:
+        if (title, href) in seen:
+            continue
+        seen.add((title, href))
+        results.append((title, href, selectors[idx]))
+    return results
+
+def _extract_articles(root) -> List[Tuple[str, str]]:
     results: List[Tuple[str, str]] = []
-    for sel, _, _ in WP_TITLE_SELECTORS:
-        for a in soup.select(sel):
-            title = a.get_text(strip=True)
-            href = a.get("href")
-            if not title or not href:
-                continue
-            key = (title, href)
-            if key in seen:
-                continue
-            seen.add(key)
-            results.append((title, href))
-    if not results:
-        for art in soup.find_all("article"):
-            a = art.find("a", href=True)
-            h = None
-            for hx in ["h1", "h2", "h3"]:
-                htag = art.find(hx)
-                if htag and htag.get_text(strip=True):
-                    h = htag.get_text(strip=True)
-                    break
-            if a and h:
-                results.append((h, a["href"]))
+    for art in root.iter("article"):
+        a = next((x for x in art.iter("a") if x.get("href") is not None), None)
+        h = None
+        for hx in ["h1", "h2", "h3"]:
+            htag = next(art.iter(hx), None)
+            if htag is not None and _text(htag):
+                h = _text(htag)
+                break
+        if a is not None and h:
+            results.append((h, a.get("href")))
+    return results
+
+def parse_posts(html: str, domain: Optional[str] = None) -> List[Tuple[str, str]]:
+    if not html or not html.strip():
+        return []
+    with METRICS.timed("parse_posts_seconds", domain=domain or ""):
+        return _parse_posts(html, domain)
+
+def _parse_posts(html: str, domain: Optional[str]) -> List[Tuple[str, str]]:
+    root = _html_tree(html)
+    learned = domain_selectors(domain)
+    found = _extract(root, learned) if learned else []
+    if not found:
+        found = _extract(root, ALL_TITLE_SELECTORS)
+        if domain and found:
+            used = {sel for _, _, sel in found}
+            learn_selectors(domain, [sel for sel in ALL_TITLE_SELECTORS if sel in used])
+    if found:
+        for sel, n in Counter(sel for _, _, sel in found).items():
+            METRICS.inc("posts_found_total", n, selector=sel)
+        return [(title, href) for title, href, _ in found]
+    results = _extract_articles(root)
+    METRICS.inc("posts_found_total", len(results), selector="article")
     return results
 
+#########################
+# STRATEGI PAGINATION
+#########################
+PAGINATION_JSON = OUTPUT_DIR / "pagination.json"   # format lama, hanya dibaca untuk migrasi
+PAGINATION_SCHEMES = ("path", "query")   # /page/N/ atau ?paged=N
+
+def save_pagination_profile(dom: str, scheme: str, last_page: int):
+    SITE_PROFILES.update(dom, pagination={"scheme": scheme, "last_page": last_page})
+
+def page_url(base: str, n: int, scheme: str) -> str:
+    root = base.rstrip("/")
+    if n <= 1:
+        return root + "/"
+    if scheme == "path":
+        return root + f"/page/{n}/"
+    sep = "&" if "?" in base else "?"
+    return root + f"{sep}paged={n}"
+
 def paginate_urls(base: str, max_pages: int) -> List[str]:
-    urls = [base.rstrip("/") + "/"]
-    for n in range(2, max_pages + 1):
-        urls.append(base.rstrip("/") + f"/page/{n}/")
-    for n in range(2, max_pages + 1):
-        sep = "&" if "?" in base else "?"
-        urls.append(base.rstrip("/") + f"{sep}paged={n}")
+    urls = [page_url(base, 1, "path")]
+    for scheme in PAGINATION_SCHEMES:
+        urls.extend(page_url(base, n, scheme) for n in range(2, max_pages + 1))
     return urls
 
-def scrape_pagination(category_url: str, max_pages: int = MAX_PAGES_PER_SITE) -> List[Tuple[str, str]]:
+def only_new(posts: List[Tuple[str, str]], known: Optional[Container[str]]) -> List[Tuple[str, str]]:
+    if known is None:
+        return posts
+    return [(t, h) for t, h in posts if h.strip() not in known]
+
+def scrape_pagination(category_url: str, max_pages: int = MAX_PAGES_PER_SITE,
+                      known: Optional[Container[str]] = None, scheme: Optional[str] = None) -> List[Tuple[str, str]]:
+    # known != None -> mode inkremental: jalan dari halaman terbaru dan berhenti di halaman
+    # yang isinya sudah dikenal semua; yang dikembalikan hanya postingan baru.
+    # scheme diisi (dari sites.json) -> skema lain tidak dicoba sama sekali
     logging.info(f"Scrape PAGINATION: {category_url}")
-    results: List[Tuple[str, str]] = []
-    for url in paginate_urls(category_url, max_pages):
+    dom = domain_of(category_url)
+    n_requests = [0]
+    counter_lock = threading.Lock()
+
+    def fetch(url: str) -> List[Tuple[str, str]]:
+        with counter_lock:
+            n_requests[0] += 1
         try:
-            resp = safe_get(url)
-            if resp.status_code != 200:
-                continue
-            posts = parse_posts(resp.text)
-            results.extend(posts)
+            return fetch_page_posts(url)
         except Exception as e:
             logging.exception(f"Gagal akses {url}: {e}")
-    return dedupe_posts(results)
+            return []
+
+    results: List[Tuple[str, str]] = list(fetch(page_url(category_url, 1, "path")))
+    seen = {href for _, href in results}
+    if not results or max_pages < 2 or (known is not None and not only_new(results, known)):
+        return dedupe_posts(only_new(results, known))
+
+    # halaman kosong, error, atau isinya sama dengan halaman sebelumnya = halaman terakhir sudah lewat
+    def has_new(posts: List[Tuple[str, str]]) -> bool:
+        return any(href not in seen for _, href in posts)
+
+    def accept(posts: List[Tuple[str, str]]):
+        results.extend(posts)
+        seen.update(href for _, href in posts)
+
+    profile = SITE_PROFILES.get(dom).get("pagination") or {}
+    cached = scheme or profile.get("scheme")
+    if scheme:
+        candidates = [scheme]
+    elif cached:
+        candidates = [cached] + [s for s in PAGINATION_SCHEMES if s != cached]
+    else:
+        candidates = list(PAGINATION_SCHEMES)
+
+    scheme = None
+    caught_up = False
+    for cand in candidates:
+        posts = fetch(page_url(category_url, 2, cand))
+        if has_new(posts):
+            scheme = cand
+            accept(posts)
+            caught_up = known is not None and not only_new(posts, known)
+            break
+    if scheme is None:
+        save_pagination_profile(dom, cached, 1)
+        logging.info(f"Pagination {dom}: cuma 1 halaman, {n_requests[0]} request")
+        return dedupe_posts(only_new(results, known))
+
+    # halaman yang menurut cache masih ada (+1 untuk cek halaman baru) diambil sekaligus,
+    # sisanya per batch kecil supaya request sia-sia setelah halaman terakhir tetap sedikit.
+    # Mode inkremental biasanya berhenti di halaman awal, jadi tidak ikut prefetch.
+    known_last = profile.get("last_page", 0) if profile.get("scheme") == scheme else 0
+    per_domain = domain_limit(dom)
+    last = 2
+    page = 3
+    with ThreadPoolExecutor(max_workers=per_domain) as pool:
+        while page <= max_pages and not caught_up:
+            end = page + per_domain - 1
+            if known is None:
+                end = max(known_last + 1, end)
+            end = min(max_pages, end)
+            batch = list(range(page, end + 1))
+            done = False
+            for n, posts in zip(batch, pool.map(lambda n: fetch(page_url(category_url, n, scheme)), batch)):
+                if not has_new(posts):
+                    done = True
+                    break
+                accept(posts)
+                last = n
+                if known is not None and not only_new(posts, known):
+                    caught_up = True
+                    break
+            if done:
+                break
+            page = end + 1
+
+    # kalau berhenti karena sudah ketemu postingan lama, halaman terakhir yang asli belum diketahui
+    save_pagination_profile(dom, scheme, max(last, known_last) if caught_up else last)
+    mode = " (inkremental)" if known is not None else ""
+    logging.info(f"Pagination {dom}: skema '{scheme}', {last} halaman{mode}, {n_requests[0]} request")
+    return dedupe_posts(only_new(results, known))
 
 def dedupe_posts(items: List[Tuple[str, str]]):
     seen = set()
@@ -188,73 +1215,346 @@ def dedupe_posts(items: List[Tuple[str, str]]):
         out.append((title.strip(), href.strip()))
     return out
 
-def scrape_pagination_with_selenium(driver: webdriver.Chrome, category_url: str, max_pages: int = MAX_PAGES_PER_SITE) -> List[Tuple[str, str]]:
-    logging.info(f"Scrape PAGINATION with Selenium: {category_url}")
-    results: List[Tuple[str, str]] = []
-    
-    urls_to_scrape = paginate_urls(category_url, max_pages)
-
-    for url in urls_to_scrape:
+#########################
+# WORDPRESS REST API
+#########################
+# Situs load-more umumnya WordPress, jadi datanya bisa diambil langsung dari
+# /wp-json/wp/v2/posts lewat HTTP biasa; Selenium hanya cadangan.
+WP_REST_JSON = OUTPUT_DIR / "wp_rest.json"   # format lama, hanya dibaca untuk migrasi
+WP_REST_PER_PAGE = 20
+WP_REST_RECHECK_DAYS = 7     # situs yang tidak punya REST dicek ulang setelah sekian hari
+
+def _rest_profile(category_url: str) -> Dict:
+    return SITE_PROFILES.get(domain_of(category_url)).get("rest") or {}
+
+def _save_rest_profile(category_url: str, api: Optional[str], category: Optional[int]):
+    SITE_PROFILES.update(domain_of(category_url),
+                         rest={"api": api, "category": category, "checked_at": int(time.time())})
+
+def _rest_url(root: str, path: str, params: Dict) -> str:
+    # root bisa ".../wp-json/wp/v2" atau ".../?rest_route=/wp/v2" (tanpa permalink cantik)
+    sep = "&" if "?" in root else "?"
+    return f"{root}{path}{sep}{urlencode(params)}"
+
+def _rest_json(url: str):
+    resp = limited_get(url, headers={"Accept": "application/json"})
+    if resp.status_code != 200 or "json" not in resp.headers.get("Content-Type", ""):
+        return None, resp
+    try:
+        return resp.json(), resp
+    except ValueError:
+        return None, resp
+
+def _category_slug(category_url: str) -> Optional[str]:
+    parts = [p for p in urlsplit(category_url).path.split("/") if p]
+    if "category" in parts and parts.index("category") + 1 < len(parts):
+        return parts[-1]
+    return None
+
+def discover_wp_rest(category_url: str) -> Optional[Dict]:
+    profile = _rest_profile(category_url)
+    if profile and (profile.get("api") or time.time() - profile["checked_at"] < WP_REST_RECHECK_DAYS * 86400):
+        return profile if profile.get("api") else None
+
+    parts = urlsplit(category_url)
+    origin = f"{parts.scheme}://{parts.netloc}"
+    slug = _category_slug(category_url)
+    for root in (f"{origin}/wp-json/wp/v2", f"{origin}/?rest_route=/wp/v2"):
         try:
-            logging.info(f"Mengunjungi halaman: {url}")
-            driver.get(url)
-            rand_delay(1, 2)
-            
-            if "page not found" in driver.page_source.lower():
-                logging.info(f"Halaman {url} tidak ditemukan, berhenti.")
-                break
-            
-            html = driver.page_source
-            posts = parse_posts(html)
-            results.extend(posts)
-        
+            category = None
+            if slug:
+                cats, _ = _rest_json(_rest_url(root, "/categories", {"slug": slug, "_fields": "id"}))
+                if not isinstance(cats, list) or not cats:
+                    continue
+                category = cats[0]["id"]
+            params = {"per_page": 1, "_fields": "link"}
+            if category:
+                params["categories"] = category
+            posts, _ = _rest_json(_rest_url(root, "/posts", params))
+            if isinstance(posts, list):
+                _save_rest_profile(category_url, root, category)
+                logging.info(f"REST WordPress ditemukan untuk {category_url}: {root} (kategori {category})")
+                return _rest_profile(category_url)
         except Exception as e:
-            logging.error(f"Gagal akses {url} dengan Selenium: {e}")
-            continue
-
-    return dedupe_posts(results)
+            logging.debug(f"Probe REST {root} gagal: {e}")
+    _save_rest_profile(category_url, None, None)
+    return None
+
+def scrape_wp_rest(category_url: str, max_pages: int = MAX_PAGES_PER_SITE,
+                   known: Optional[Container[str]] = None) -> Optional[List[Tuple[str, str]]]:
+    # None -> situs tidak punya REST yang bisa dipakai, pemanggil harus pakai Selenium
+    profile = discover_wp_rest(category_url)
+    if not profile:
+        return None
+    logging.info(f"Scrape REST: {category_url}")
+    results: List[Tuple[str, str]] = []
+    for page in range(1, max_pages + 1):
+        params = {"page": page, "per_page": WP_REST_PER_PAGE, "_fields": "link,title"}
+        if profile.get("category"):
+            params["categories"] = profile["category"]
+        items, resp = _rest_json(_rest_url(profile["api"], "/posts", params))
+        if items is None:
+            if page == 1:
+                # REST yang dulu jalan sekarang mati -> lupakan profilnya, biar dicek ulang nanti
+                _save_rest_profile(category_url, None, None)
+                return None
+            break  # WordPress balas 400 kalau halaman melewati yang terakhir
+        batch = []
+        for it in items:
+            link = it.get("link")
+            title = re.sub(r"<[^>]+>", "", (it.get("title") or {}).get("rendered", ""))
+            title = htmllib.unescape(title).strip()
+            if link and title:
+                batch.append((title, link))
+        results.extend(batch)
+        if not batch or (known is not None and not only_new(batch, known)):
+            break
+        if page >= int(resp.headers.get("X-WP-TotalPages", max_pages)):
+            break
+    return dedupe_posts(only_new(results, known))
 
 #########################
 # LOAD MORE SELENIUM
 #########################
 LOAD_MORE_BUTTON_SELECTORS = [
-    (By.CSS_SELECTOR, "button.load-more"),
-    (By.CSS_SELECTOR, "a.load-more"),
-    (By.XPATH, "//button[contains(translate(., 'LOADMOR', 'loadmor'), 'load more') or contains(., 'Muat Lagi')]"),
-    (By.XPATH, "//a[contains(translate(., 'LOADMOR', 'loadmor'), 'load more') or contains(., 'Muat Lagi')]"),
-    (By.CSS_SELECTOR, "#load-more, .more-posts, .infinite-scroll .next")
+    (BY_CSS, "button.load-more"),
+    (BY_CSS, "a.load-more"),
+    (BY_XPATH, "//button[contains(translate(., 'LOADMOR', 'loadmor'), 'load more') or contains(., 'Muat Lagi')]"),
+    (BY_XPATH, "//a[contains(translate(., 'LOADMOR', 'loadmor'), 'load more') or contains(., 'Muat Lagi')]"),
+    (BY_CSS, "#load-more, .more-posts, .infinite-scroll .next")
 ]
 
-def build_driver():
+#########################
+# DRIVER MANAGER
+#########################
+_chromedriver_path: Optional[str] = None
+_chromedriver_lock = threading.Lock()
+
+def chromedriver_path(refresh: bool = False) -> str:
+    # ChromeDriverManager().install() cek versi + filesystem tiap dipanggil, jadi hasilnya di-cache
+    global _chromedriver_path
+    with _chromedriver_lock:
+        if not refresh:
+            if _chromedriver_path and os.path.exists(_chromedriver_path):
+                return _chromedriver_path
+            try:
+                cached = CHROMEDRIVER_CACHE.read_text(encoding="utf-8").strip()
+            except IOError:
+                cached = ""
+            if cached and os.path.exists(cached):
+                _chromedriver_path = cached
+                return cached
+        from webdriver_manager.chrome import ChromeDriverManager
+        _chromedriver_path = ChromeDriverManager().install()
+        CHROMEDRIVER_CACHE.write_text(_chromedriver_path, encoding="utf-8")
+        return _chromedriver_path
+
+def build_driver(headless: bool = False, block_images: bool = False,
+                 profile_dir: pathlib.Path = CHROME_PROFILE_DIR) -> webdriver.Chrome:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.common.exceptions import WebDriverException
+    ensure_dirs()
     options = webdriver.ChromeOptions()
     options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_argument("--start-maximized")
-    options.add_argument(f"--user-data-dir={CHROME_PROFILE_DIR.resolve()}")
-    service = Service(ChromeDriverManager().install())
-    return webdriver.Chrome(service=service, options=options)
+    options.add_argument(f"--user-data-dir={pathlib.Path(profile_dir).resolve()}")
+    if headless:
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1366,900")
+        options.add_argument("--disable-gpu")
+        # halaman dianggap siap saat DOM jadi, tidak menunggu semua resource
+        options.page_load_strategy = "eager"
+    if block_images:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    try:
+        return webdriver.Chrome(service=Service(chromedriver_path()), options=options)
+    except WebDriverException:
+        # path cache bisa basi setelah Chrome update -> resolve ulang sekali
+        logging.warning("Gagal start Chrome dengan chromedriver dari cache, resolve ulang...")
+        return webdriver.Chrome(service=Service(chromedriver_path(refresh=True)), options=options)
+
+class DriverManager:
+    """
+    Satu sesi Chrome yang dipakai bergantian (scraping lalu posting). get() mengecek sesi
+    masih hidup dan diam-diam start ulang kalau mati; on_restart dipanggil setelah restart
+    supaya pemakai bisa memulihkan keadaan (misal buka lagi halaman home).
+    """
+
+    def __init__(self, headless: bool = False, block_images: bool = False,
+                 profile_dir: Optional[pathlib.Path] = CHROME_PROFILE_DIR, on_restart=None):
+        self.headless = headless
+        self.block_images = block_images
+        # profile_dir None -> profil sementara, dihapus saat quit()
+        self.temp_profile = profile_dir is None
+        self.profile_dir = pathlib.Path(tempfile.mkdtemp(prefix="tweetbot_chrome_")) if profile_dir is None else profile_dir
+        self.on_restart = on_restart
+        self.driver: Optional[webdriver.Chrome] = None
+        self.lock = threading.RLock()
+
+    def _alive(self) -> bool:
+        from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
+        try:
+            self.driver.current_window_handle
+            return True
+        except (InvalidSessionIdException, WebDriverException):
+            return False
+
+    def get(self) -> webdriver.Chrome:
+        with self.lock:
+            if self.driver is None:
+                self.driver = build_driver(self.headless, self.block_images, self.profile_dir)
+            elif not self._alive():
+                self.restart()
+            return self.driver
+
+    def restart(self) -> webdriver.Chrome:
+        with self.lock:
+            logging.warning("Sesi Chrome mati, start ulang...")
+            self._quit_driver()
+            self.driver = build_driver(self.headless, self.block_images, self.profile_dir)
+            if self.on_restart:
+                self.on_restart(self.driver)
+            return self.driver
+
+    def run(self, fn, *args, **kwargs):
+        # fn(driver, ...) diulang sekali dengan sesi baru kalau sesinya mati di tengah jalan
+        from selenium.common.exceptions import InvalidSessionIdException
+        try:
+            return fn(self.get(), *args, **kwargs)
+        except InvalidSessionIdException:
+            self.restart()
+            return fn(self.get(), *args, **kwargs)
+
+    def _quit_driver(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+    def quit(self):
+        with self.lock:
+            self._quit_driver()
+            if self.temp_profile:
+                shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+_shared_driver: Optional[DriverManager] = None
+
+def shared_driver() -> DriverManager:
+    # satu Chrome per proses dengan profil utama, dipakai scraping dan posting
+    global _shared_driver
+    if _shared_driver is None:
+        _shared_driver = DriverManager(headless=POST_HEADLESS)
+    return _shared_driver
+
+def close_shared_driver():
+    # tutup Chrome sesi utama kalau pernah dibuka, tanpa membuat yang baru
+    global _shared_driver
+    if _shared_driver is not None:
+        _shared_driver.quit()
+        _shared_driver = None
+
+
+# Ambil pasangan (judul, href) yang BELUM pernah dikembalikan di halaman ini. Elemen yang sudah
+# diambil ditandai atribut data-tweetbot, jadi tiap klik load-more hanya memproses item baru
+# tanpa serialisasi seluruh DOM. Urutan dan teks judul mengikuti parse_posts.
+_NEW_POSTS_JS = """
+const selectors = arguments[0];
+const out = [];
+const keys = new Set();
+const taken = [];
+const textOf = (el) => {
+    const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+    let s = "";
+    while (walker.nextNode()) s += walker.currentNode.nodeValue.trim();
+    return s;
+};
+for (const sel of selectors) {
+    for (const a of document.querySelectorAll(sel)) {
+        if (a.hasAttribute("data-tweetbot")) continue;
+        taken.push(a);
+        const title = textOf(a);
+        const href = a.getAttribute("href");
+        if (!title || !href) continue;
+        const key = title + "\\u0000" + href;
+        if (keys.has(key)) continue;
+        keys.add(key);
+        out.push([title, href]);
+    }
+}
+for (const a of taken) a.setAttribute("data-tweetbot", "1");
+return out;
+"""
 
-def scrape_load_more(driver: webdriver.Chrome, category_url: str, max_clicks: int = MAX_PAGES_PER_SITE) -> List[Tuple[str, str]]:
+def scrape_load_more(driver: webdriver.Chrome, category_url: str, max_clicks: int = MAX_PAGES_PER_SITE,
+                     known: Optional[Container[str]] = None) -> List[Tuple[str, str]]:
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import WebDriverException
     logging.info(f"Scrape LOAD MORE: {category_url}")
-    driver.get(category_url)
+    dom = domain_of(category_url)
+    with METRICS.timed("selenium_page_load_seconds", domain=dom):
+        driver.get(category_url)
     all_posts: List[Tuple[str, str]] = []
+    seen: Set[str] = set()
 
-    def grab() -> List[Tuple[str, str]]:
-        html = driver.page_source
-        return parse_posts(html)
+    all_selectors = ALL_TITLE_SELECTORS
+    selectors = domain_selectors(dom) or all_selectors
+    # mode diff (JS) dipakai kalau selector menemukan sesuatu di halaman pertama;
+    # kalau tidak (mis. cuma cocok fallback <article>), balik ke parse page_source penuh
+    diff_mode = True
 
-    all_posts.extend(grab())
+    def grab(first: bool = False) -> List[Tuple[str, str]]:
+        nonlocal diff_mode, selectors
+        if diff_mode:
+            try:
+                posts = driver.execute_script(_NEW_POSTS_JS, selectors)
+                if first and not posts and selectors != all_selectors:
+                    selectors = all_selectors
+                    posts = driver.execute_script(_NEW_POSTS_JS, selectors)
+            except WebDriverException as e:
+                logging.warning(f"Ekstraksi JS gagal di {dom}, pakai page_source: {e}")
+                posts = None
+            if posts or (posts is not None and not first):
+                return [(t, h) for t, h in posts]
+            diff_mode = False
+        return parse_posts(driver.page_source, dom)
+
+    def take(posts: List[Tuple[str, str]]) -> bool:
+        # simpan yang belum terlihat; True kalau batch baru isinya sudah dikenal semua
+        batch = [(t, h) for t, h in posts if h.strip() not in seen]
+        seen.update(h.strip() for _, h in batch)
+        all_posts.extend(batch)
+        return known is not None and not only_new(batch, known)
+
+    if take(grab(first=True)):
+        return []
+
+    # tombol yang cocok terakhir kali dicoba duluan, biar tidak menunggu 5 detik per selector yang gagal
+    cached = SITE_PROFILES.get(dom).get("load_more_button")
+    order = list(range(len(LOAD_MORE_BUTTON_SELECTORS)))
+    if isinstance(cached, int) and 0 <= cached < len(order):
+        order.remove(cached)
+        order.insert(0, cached)
 
     for _ in range(max_clicks - 1):
+        t0 = time.perf_counter()
         btn = None
-        for by, sel in LOAD_MORE_BUTTON_SELECTORS:
+        for i in order:
             try:
-                btn = WebDriverWait(driver, 5).until(EC.element_to_be_clickable((by, sel)))
+                btn = WebDriverWait(driver, 5).until(EC.element_to_be_clickable(LOAD_MORE_BUTTON_SELECTORS[i]))
                 if btn:
                     break
             except Exception:
                 continue
         if not btn:
             break
+        if i != cached:
+            cached = i
+            SITE_PROFILES.update(dom, load_more_button=i)
         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", btn)
         rand_delay(1, 2)
         try:
@@ -262,96 +1562,213 @@ def scrape_load_more(driver: webdriver.Chrome, category_url: str, max_clicks: in
         except Exception:
             driver.execute_script("arguments[0].click();", btn)
         rand_delay(1, 3)
-        all_posts.extend(grab())
+        stop = take(grab())
+        # waktu satu putaran: cari tombol, klik, tunggu, ambil postingan baru
+        METRICS.inc("selenium_clicks_total", domain=dom)
+        METRICS.observe("selenium_click_seconds", time.perf_counter() - t0, domain=dom)
+        if stop:
+            logging.info(f"Load more {domain_of(category_url)}: sudah sampai postingan lama, berhenti.")
+            break
 
-    return dedupe_posts(all_posts)
+    return dedupe_posts(only_new(all_posts, known))
+
+#########################
+# POOL SELENIUM
+#########################
+def available_memory_mb() -> Optional[int]:
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (IOError, ValueError):
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+def selenium_pool_size(n_jobs: int) -> int:
+    if SELENIUM_POOL_SIZE > 0:
+        size = SELENIUM_POOL_SIZE
+    else:
+        size = os.cpu_count() or 1
+        mem = available_memory_mb()
+        if mem is not None:
+            size = min(size, mem // SELENIUM_DRIVER_MEM_MB)
+    return max(1, min(size, n_jobs))
+
+def run_selenium_pool(jobs: List[Tuple], size: int) -> List[List[Tuple[str, str]]]:
+    # jobs: (fungsi, argumen...) dengan fungsi(driver, *argumen); tiap worker punya Chrome
+    # headless sendiri dengan profil sementara. Hasil urut sesuai jobs.
+    managers: Queue = Queue()
+    all_managers = [DriverManager(headless=True, block_images=True, profile_dir=None) for _ in range(size)]
+    for m in all_managers:
+        managers.put(m)
+
+    def work(job) -> List[Tuple[str, str]]:
+        fn, *args = job
+        m = managers.get()
+        try:
+            return m.run(fn, *args)
+        except Exception as e:
+            logging.exception(f"Gagal scrape Selenium {args[0]}: {e}")
+            return []
+        finally:
+            managers.put(m)
+
+    logging.info(f"Pool Selenium: {size} Chrome headless untuk {len(jobs)} kategori")
+    try:
+        with ThreadPoolExecutor(max_workers=size) as pool:
+            return list(pool.map(work, jobs))
+    finally:
+        for m in all_managers:
+            m.quit()
 
 #########################
 # TWEETER HOME
 #########################
+# urutan = prioritas; entri terakhir adalah fallback umum
 HOME_TEXTBOX_SELECTORS = [
-    (By.CSS_SELECTOR, "div[role='textbox'][data-testid='tweetTextarea_0']"),
-    (By.CSS_SELECTOR, "div[data-testid='tweetTextarea_0']"),
+    (BY_CSS, "div[role='textbox'][data-testid='tweetTextarea_0']"),
+    (BY_CSS, "div[data-testid='tweetTextarea_0']"),
+    (BY_CSS, "div[role='textbox']"),
 ]
 
 HOME_TWEET_BUTTON_SELECTORS = [
-    (By.CSS_SELECTOR, "div[data-testid='tweetButtonInline']"),
-    (By.CSS_SELECTOR, "button[data-testid='tweetButtonInline']"),
+    (BY_CSS, "div[data-testid='tweetButtonInline']"),
+    (BY_CSS, "button[data-testid='tweetButtonInline']"),
+    (BY_CSS, "div[role='button'][data-testid*='tweetButton']"),
 ]
 
+HOME_WAIT_TIMEOUT = 10      # detik, batas tunggu kondisi DOM di halaman home
+HOME_CONFIRM_TIMEOUT = 3    # detik, batas tunggu composer kosong setelah klik Post
+WAIT_POLL_INTERVAL = 0.05
+
+#########################
+# WAIT KONDISI DOM
+#########################
+# Semua kondisi dicek dengan satu execute_script per polling: semua selector fallback
+# sekaligus (bukan WebDriverWait 5 detik per selector), tanpa sleep tetap.
+_FIRST_MATCH_JS = """
+const [selectors, needEnabled] = arguments;
+for (const sel of selectors) {
+    for (const el of document.querySelectorAll(sel)) {
+        const r = el.getBoundingClientRect();
+        if (r.width === 0 && r.height === 0) continue;
+        if (needEnabled && (el.disabled || el.getAttribute("aria-disabled") === "true")) continue;
+        return el;
+    }
+}
+return null;
+"""
+
+_IN_VIEWPORT_JS = """
+const r = arguments[0].getBoundingClientRect();
+const h = window.innerHeight || document.documentElement.clientHeight;
+const w = window.innerWidth || document.documentElement.clientWidth;
+return r.top >= 0 && r.left >= 0 && r.bottom <= h && r.right <= w;
+"""
+
+_IS_FOCUSED_JS = """
+const el = arguments[0], act = document.activeElement;
+return act === el || (act !== null && el.contains(act));
+"""
+
+_COMPOSER_EMPTY_JS = """
+for (const sel of arguments[0]) {
+    const el = document.querySelector(sel);
+    if (el) return el.textContent.trim() === "";
+}
+return false;
+"""
+
+def wait_for(driver: webdriver.Chrome, condition, timeout: float = HOME_WAIT_TIMEOUT):
+    from selenium.webdriver.support.ui import WebDriverWait
+    return WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL_INTERVAL).until(condition)
+
+def _css(selectors: List[Tuple[str, str]]) -> List[str]:
+    return [sel for by, sel in selectors if by == BY_CSS]
+
+def first_visible(selectors: List[Tuple[str, str]], enabled: bool = False):
+    css = _css(selectors)
+    return lambda d: d.execute_script(_FIRST_MATCH_JS, css, enabled) or False
+
+def in_viewport(el):
+    return lambda d: d.execute_script(_IN_VIEWPORT_JS, el)
+
+def is_focused(el):
+    return lambda d: d.execute_script(_IS_FOCUSED_JS, el)
+
+def composer_empty(selectors: List[Tuple[str, str]]):
+    css = _css(selectors)
+    return lambda d: d.execute_script(_COMPOSER_EMPTY_JS, css)
+
 def wait_home_ready(driver: webdriver.Chrome, timeout: int = 60):
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
     logging.info("Menunggu halaman beranda X/Twitter dimuat...")
     try:
         WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div[data-testid='primaryColumn']"))
+            EC.presence_of_element_located((BY_CSS, "div[data-testid='primaryColumn']"))
         )
     except TimeoutException:
         try:
             WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, "//div[contains(text(), 'Masuk ke X')]"))
+                EC.presence_of_element_located((BY_XPATH, "//div[contains(text(), 'Masuk ke X')]"))
             )
             logging.error("Terdeteksi di halaman login. Silakan login secara manual.")
+            if not INTERACTIVE:
+                # mode daemon: tidak ada yang bisa menekan ENTER, login dulu lewat `python main.py`
+                raise TimeoutException("Belum login ke X/Twitter dan mode non-interaktif aktif.")
             input("Setelah login, tekan ENTER di sini untuk melanjutkan...")
             WebDriverWait(driver, timeout).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div[data-testid='primaryColumn']"))
+                EC.presence_of_element_located((BY_CSS, "div[data-testid='primaryColumn']"))
             )
         except TimeoutException:
             logging.error("Gagal memuat halaman beranda atau terdeteksi di halaman login. Mungkin struktur halaman X/Twitter sudah berubah.")
             raise
 
-def find_home_textbox(driver: webdriver.Chrome):
-    for by, sel in HOME_TEXTBOX_SELECTORS:
-        try:
-            box = WebDriverWait(driver, 5).until(EC.presence_of_element_located((by, sel)))
-
-            # scroll ke tengah layar
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", box)
-            time.sleep(0.5)
-
-            # cek apakah terlihat di viewport
-            is_visible = driver.execute_script("""
-                const box = arguments[0];
-                const rect = box.getBoundingClientRect();
-                return (
-                    rect.top >= 0 &&
-                    rect.left >= 0 &&
-                    rect.bottom <= (window.innerHeight || document.documentElement.clientHeight) &&
-                    rect.right <= (window.innerWidth || document.documentElement.clientWidth)
-                );
-            """, box)
-
-            if not is_visible:
-                driver.execute_script("window.scrollBy(0, -300);")
-                time.sleep(0.5)
+# login manual pakai input(), jadi kalau banyak akun jalan bersamaan harus bergiliran
+_login_lock = threading.Lock()
 
-            try:
-                box.click()
-            except Exception:
-                # fallback kalau ketutup
-                driver.execute_script("arguments[0].focus(); arguments[0].click();", box)
+def open_home(driver: webdriver.Chrome):
+    driver.get("https://x.com/home")
+    with _login_lock:
+        wait_home_ready(driver, timeout=60)
 
-            return box
-        except Exception:
-            continue
+def find_home_textbox(driver: webdriver.Chrome):
+    from selenium.common.exceptions import TimeoutException
+    box = wait_for(driver, first_visible(HOME_TEXTBOX_SELECTORS))
 
-    # fallback terakhir cari textbox umum
-    box = WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='textbox']")))
+    # scroll ke tengah layar, lalu pastikan memang terlihat di viewport
     driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", box)
-    driver.execute_script("arguments[0].focus(); arguments[0].click();", box)
+    try:
+        wait_for(driver, in_viewport(box), 1)
+    except TimeoutException:
+        driver.execute_script("window.scrollBy(0, -300);")
+
+    try:
+        box.click()
+    except Exception:
+        # fallback kalau ketutup
+        driver.execute_script("arguments[0].focus(); arguments[0].click();", box)
+    try:
+        wait_for(driver, is_focused(box), 2)
+    except TimeoutException:
+        driver.execute_script("arguments[0].focus();", box)
     return box
 
 
 def find_home_tweet_button(driver: webdriver.Chrome):
-    for by, sel in HOME_TWEET_BUTTON_SELECTORS:
-        try:
-            return WebDriverWait(driver, 5).until(EC.element_to_be_clickable((by, sel)))
-        except Exception:
-            continue
-    return WebDriverWait(driver, 5).until(
-        EC.element_to_be_clickable((By.XPATH, "//div[@role='button' and contains(@data-testid,'tweetButton')]"))
-    )
+    # tombol baru aktif setelah teks masuk ke composer
+    return wait_for(driver, first_visible(HOME_TWEET_BUTTON_SELECTORS, enabled=True))
 
 def send_tweet_on_home(driver: webdriver.Chrome, text: str) -> bool:
+    from selenium.webdriver.common.keys import Keys
+    from selenium.common.exceptions import TimeoutException
+    t0 = time.perf_counter()
     try:
         box = find_home_textbox(driver)
         box.send_keys(Keys.CONTROL, 'a', Keys.DELETE)
@@ -359,6 +1776,8 @@ def send_tweet_on_home(driver: webdriver.Chrome, text: str) -> bool:
     except Exception as e:
         logging.error(f"Gagal ketik: {e}")
         return False
+    t1 = time.perf_counter()
+    METRICS.observe("post_type_seconds", t1 - t0)
     try:
         btn = find_home_tweet_button(driver)
         driver.execute_script("arguments[0].scrollIntoView({block:'center'});", btn)
@@ -366,7 +1785,15 @@ def send_tweet_on_home(driver: webdriver.Chrome, text: str) -> bool:
     except Exception as e:
         logging.error(f"Gagal klik: {e}")
         return False
-    time.sleep(random.uniform(1.0, 2.0))
+    t2 = time.perf_counter()
+    METRICS.observe("post_click_seconds", t2 - t1)
+    # composer dikosongkan X setelah tweet terkirim
+    try:
+        wait_for(driver, composer_empty(HOME_TEXTBOX_SELECTORS), HOME_CONFIRM_TIMEOUT)
+        METRICS.observe("post_confirm_seconds", time.perf_counter() - t2)
+    except TimeoutException:
+        METRICS.inc("post_confirm_timeouts_total")
+        logging.warning("Composer belum kosong setelah klik, anggap tweet terkirim.")
     logging.info("Tweet dikirim dari Home.")
     return True
 
@@ -374,38 +1801,202 @@ def scroll_natural(driver):
     """
     Scroll naik setelah tweet supaya textbox tetap kelihatan.
     """
+    from selenium.common.exceptions import TimeoutException
     try:
-        box = driver.find_element(By.CSS_SELECTOR, "div[role='textbox']")
+        box = driver.find_element(BY_CSS, "div[role='textbox']")
         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", box)
-        time.sleep(0.5)
 
         # kalau masih ketutupan, scroll naik lagi
         for _ in range(3):
-            is_visible = driver.execute_script("""
-                const box = arguments[0];
-                const rect = box.getBoundingClientRect();
-                return (
-                    rect.top >= 0 &&
-                    rect.bottom <= (window.innerHeight || document.documentElement.clientHeight)
-                );
-            """, box)
-            if is_visible:
+            try:
+                wait_for(driver, in_viewport(box), 0.5)
                 break
-            driver.execute_script("window.scrollBy(0, -200);")
-            time.sleep(0.5)
+            except TimeoutException:
+                driver.execute_script("window.scrollBy(0, -200);")
     except Exception as e:
         logging.warning(f"Gagal scroll_natural: {e}")
 
 
 
+#########################
+# PENJADWAL POSTING
+#########################
+RATE_LIMIT_TEXTS = [
+    "rate limit", "try again later", "over the daily limit", "you are unable to",
+    "coba lagi nanti", "batas harian", "melebihi batas",
+]
+
+_TOAST_TEXT_JS = """
+return Array.from(document.querySelectorAll("[data-testid='toast'], [role='alert']"))
+    .map(el => el.textContent).join("\\n");
+"""
+
+def detect_rate_limit(driver: webdriver.Chrome) -> bool:
+    from selenium.common.exceptions import WebDriverException
+    try:
+        text = (driver.execute_script(_TOAST_TEXT_JS) or "").lower()
+    except WebDriverException:
+        return False
+    if any(t in text for t in RATE_LIMIT_TEXTS):
+        logging.warning(f"Tanda rate limit dari X: {text.strip()[:120]}")
+        return True
+    return False
+
+def spread_by_domain(posts: List[Tuple[str, str]], gap: int) -> List[Tuple[str, str]]:
+    # susun ulang supaya dua post dari domain yang sama berjarak minimal `gap` item
+    # (kalau masih memungkinkan); urutan acak di dalam tiap domain tetap dipakai
+    if gap <= 0 or len(posts) < 2:
+        return list(posts)
+    by_domain: Dict[str, deque] = {}
+    for item in posts:
+        by_domain.setdefault(domain_of(item[1]), deque()).append(item)
+    last_used: Dict[str, int] = {}
+    out: List[Tuple[str, str]] = []
+    for pos in range(len(posts)):
+        ready = [d for d in by_domain if pos - last_used.get(d, -gap - 1) > gap]
+        if ready:
+            # domain dengan sisa terbanyak lebih sering dipilih supaya tidak menumpuk di akhir
+            dom = random.choices(ready, weights=[len(by_domain[d]) for d in ready])[0]
+        else:
+            dom = min(by_domain, key=lambda d: last_used.get(d, -1))
+        out.append(by_domain[dom].popleft())
+        last_used[dom] = pos
+        if not by_domain[dom]:
+            del by_domain[dom]
+    return out
+
+def _parse_hhmm(s: str) -> int:
+    h, m = s.split(":")
+    return int(h) * 60 + int(m)
+
+def seconds_until_window(windows: List[Tuple[str, str]], now: Optional[datetime] = None) -> float:
+    # 0 kalau sekarang di dalam salah satu jendela posting (jam lokal), selain itu detik sampai jendela berikutnya
+    if not windows:
+        return 0.0
+    now = now or datetime.now()
+    minute = now.hour * 60 + now.minute + now.second / 60
+    waits = []
+    for start_s, end_s in windows:
+        start, end = _parse_hhmm(start_s), _parse_hhmm(end_s)
+        inside = start <= minute < end if start <= end else (minute >= start or minute < end)
+        if inside:
+            return 0.0
+        waits.append((start - minute) % (24 * 60))
+    return min(waits) * 60
+
+class TokenBucket:
+    """Maksimal `capacity` post per `period` detik, terisi ulang merata; capacity 0 = tanpa batas."""
+
+    def __init__(self, capacity: int, period: float, tokens: Optional[float] = None, updated: Optional[float] = None):
+        self.capacity = capacity
+        self.period = period
+        self.tokens = float(capacity if tokens is None else min(tokens, capacity))
+        self.updated = updated or time.time()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / self.period)
+        self.updated = now
+
+    def wait_time(self, now: Optional[float] = None) -> float:
+        if self.capacity <= 0:
+            return 0.0
+        now = now or time.time()
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) * self.period / self.capacity
+
+    def take(self, now: Optional[float] = None):
+        self._refill(now or time.time())
+        self.tokens = max(0.0, self.tokens - 1)
+
+    def drain(self):
+        self.tokens = 0.0
+        self.updated = time.time()
+
+class PostScheduler:
+    """
+    Mengatur kapan tweet berikutnya boleh dikirim: jeda acak DELAY_TWEET_RANGE, batas per jam
+    dan per hari (token bucket), jendela jam posting, dan faktor pengali yang naik saat X
+    memberi tanda rate limit lalu turun lagi perlahan. Keadaan disimpan ke scheduler.json
+    supaya batas tetap berlaku setelah script di-restart.
+    """
+
+    def __init__(self, state_path: pathlib.Path = SCHEDULER_JSON, per_hour: int = POST_LIMIT_PER_HOUR,
+                 per_day: int = POST_LIMIT_PER_DAY, windows: Optional[List[Tuple[str, str]]] = None):
+        self.state_path = state_path
+        self.windows = POSTING_WINDOWS if windows is None else windows
+        state = {}
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (IOError, ValueError):
+            pass
+        hour, day = state.get("hour", {}), state.get("day", {})
+        self.hour = TokenBucket(per_hour, 3600, hour.get("tokens"), hour.get("updated"))
+        self.day = TokenBucket(per_day, 86400, day.get("tokens"), day.get("updated"))
+        self.factor = float(state.get("factor", 1.0))
+        self.next_at = float(state.get("next_at", 0.0))
+
+    def _save(self):
+        state = {
+            "hour": {"tokens": self.hour.tokens, "updated": self.hour.updated},
+            "day": {"tokens": self.day.tokens, "updated": self.day.updated},
+            "factor": self.factor,
+            "next_at": self.next_at,
+        }
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.state_path)
+
+    def delay(self) -> Tuple[float, str]:
+        now = time.time()
+        waits = [
+            (max(0.0, self.next_at - now), "jeda antar tweet"),
+            (self.hour.wait_time(now), "batas per jam"),
+            (self.day.wait_time(now), "batas per hari"),
+            (seconds_until_window(self.windows), "di luar jam posting"),
+        ]
+        return max(waits)
+
+    def wait_turn(self, stop: Optional[threading.Event] = None) -> bool:
+        # False kalau dihentikan lewat `stop` sebelum giliran tiba
+        while True:
+            t, reason = self.delay()
+            if t <= 0:
+                return True
+            logging.info(f"Jadwal: tunggu {t:.2f} detik ({reason})...")
+            if stop is not None:
+                if stop.wait(t):
+                    return False
+            else:
+                time.sleep(t)
+
+    def record_success(self):
+        now = time.time()
+        self.hour.take(now)
+        self.day.take(now)
+        self.factor = max(1.0, self.factor * RATE_LIMIT_RECOVERY)
+        self.next_at = now + random.uniform(*DELAY_TWEET_RANGE) * self.factor
+        self._save()
+
+    def record_rate_limited(self):
+        # X menolak: perlambat, dan anggap kuota jam ini habis
+        self.factor = min(RATE_LIMIT_MAX_FACTOR, self.factor * RATE_LIMIT_BACKOFF)
+        self.hour.drain()
+        self.next_at = time.time() + random.uniform(*DELAY_TWEET_RANGE) * self.factor
+        logging.warning(f"Rate limit: delay sekarang x{self.factor:.1f}")
+        self._save()
+
 #########################
 # PROGRESS QUEUE
 #########################
 def prompt_reset():
     ans = input("Reset progress? (y/n): ").strip().lower()
     if ans == "y":
-        if POSTED_TXT.exists(): POSTED_TXT.unlink()
+        reset_posted()
         if QUEUE_JSON.exists(): QUEUE_JSON.unlink()
+        queue_store().replace([])
         print("Progress direset.\n")
     else:
         print("Lanjut dari progress sebelumnya.\n")
@@ -414,37 +2005,467 @@ def prompt_scrape_again() -> bool:
     ans = input("Scrape ulang situs web? (y/n): ").strip().lower()
     return ans == "y"
 
+def _fsync_dir(path: pathlib.Path):
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+class QueueLockedError(RuntimeError):
+    """Journal antrean sedang dipegang proses lain (bot/daemon yang masih jalan)."""
+
+def _try_lock(fh) -> bool:
+    # kunci eksklusif tanpa menunggu; fcntl di Linux/macOS, msvcrt di Windows
+    try:
+        import fcntl
+    except ImportError:
+        import msvcrt
+        try:
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+    try:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+class QueueStore:
+    """
+    Antrean tweet di atas journal append-only (satu record JSON per baris):
+      {"op": "add", "i": 7, "text": "..."}       -> masuk antrean
+      {"op": "claim", "i": 7, "acct": "akun1"}   -> diambil oleh akun tertentu
+      {"op": "done", "i": 7}                     -> selesai (terposting atau dibuang)
+    Offset antrean = index terkecil yang belum "done". Item yang sudah di-claim tapi belum
+    done dikembalikan ke akun yang sama setelah restart, jadi tidak ada tweet yang diposting
+    dua kali oleh akun berbeda. Journal di-compact (ditulis ulang atomik) secara berkala.
+    Hanya satu proses yang boleh menulis: selama terbuka, file .lock di sebelah journal dikunci
+    eksklusif. read_only=True (mis. `status` selagi bot jalan) tidak mengunci dan tidak menulis apa pun.
+    """
+
+    def __init__(self, path: pathlib.Path = QUEUE_JOURNAL, read_only: bool = False):
+        self.path = path
+        self.read_only = read_only
+        self.lock = threading.RLock()
+        self.pending: deque = deque()                # (index, teks) yang belum di-claim
+        self.claimed: Dict[str, deque] = {}          # akun -> item yang di-claim sebelum restart
+        self.in_flight: Dict[int, Tuple[str, str]] = {}  # index -> (akun, teks) yang sedang diposting
+        self.next_index = 0
+        self.done_since_compact = 0
+        self._fh = None
+        self._lock_fh = None
+        if not read_only:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._lock_fh = open(path.with_suffix(".lock"), "a+")
+            if not _try_lock(self._lock_fh):
+                self._lock_fh.close()
+                raise QueueLockedError(
+                    f"Antrean {path} sedang dipakai proses lain (bot/daemon masih jalan?). "
+                    "Hentikan dulu, atau pakai `status` yang cuma membaca."
+                )
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            if QUEUE_JSON.exists():
+                with open(QUEUE_JSON, "r", encoding="utf-8") as f:
+                    texts = json.load(f)
+                if self.read_only:
+                    self.pending = deque(enumerate(texts))
+                    self.next_index = len(texts)
+                else:
+                    self.replace(texts)
+                    logging.info(f"Antrean lama {QUEUE_JSON} dipindah ke {self.path}")
+            return
+        items: Dict[int, str] = {}
+        owners: Dict[int, str] = {}
+        done: Set[int] = set()
+        damaged = False
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    damaged = True  # baris terakhir yang terpotong karena crash
+                    continue
+                if rec.get("op") == "add":
+                    items[rec["i"]] = rec["text"]
+                elif rec.get("op") == "claim":
+                    owners[rec["i"]] = rec["acct"]
+                elif rec.get("op") == "done":
+                    done.add(rec["i"])
+        for i in sorted(items):
+            if i in done:
+                continue
+            if i in owners:
+                self.claimed.setdefault(owners[i], deque()).append((i, items[i]))
+            else:
+                self.pending.append((i, items[i]))
+        self.next_index = max(items, default=-1) + 1
+        if (done or damaged) and not self.read_only:
+            self.compact()
+
+    def _append(self, records: List[Dict]):
+        if self.read_only:
+            raise RuntimeError("QueueStore read_only tidak boleh ditulis")
+        if self._fh is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path, "a", encoding="utf-8")
+        self._fh.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.pending) + sum(len(q) for q in self.claimed.values())
+
+    def _gauge(self):
+        METRICS.set("queue_depth", len(self))
+        METRICS.set("queue_in_flight", len(self.in_flight))
+
+    def __iter__(self):
+        with self.lock:
+            items = [it for q in self.claimed.values() for it in q] + list(self.pending)
+            return iter([text for _, text in items])
+
+    def known_texts(self) -> Set[str]:
+        # semua teks yang belum done, termasuk yang sedang diposting
+        with self.lock:
+            texts = set(self)
+            texts.update(text for _, text in self.in_flight.values())
+            return texts
+
+    def extend(self, texts: List[str]):
+        with self.lock:
+            records = []
+            for text in texts:
+                self.pending.append((self.next_index, text))
+                records.append({"op": "add", "i": self.next_index, "text": text})
+                self.next_index += 1
+            if records:
+                self._append(records)
+            self._gauge()
+
+    def claim(self, account: str) -> Optional[Tuple[int, str]]:
+        # item milik akun ini yang tertinggal sebelum restart didahulukan
+        with self.lock:
+            own = self.claimed.get(account)
+            if own:
+                item = own.popleft()
+            elif self.pending:
+                item = self.pending.popleft()
+                self._append([{"op": "claim", "i": item[0], "acct": account}])
+            else:
+                return None
+            self.in_flight[item[0]] = (account, item[1])
+            self._gauge()
+            return item
+
+    def popleft(self) -> Tuple[int, str]:
+        item = self.claim(DEFAULT_ACCOUNT)
+        if item is None:
+            raise IndexError("antrean kosong")
+        return item
+
+    def push_front(self, item: Tuple[int, str]):
+        # kembalikan item yang batal diposting ke depan antrean akun yang meng-claim-nya
+        with self.lock:
+            account, _ = self.in_flight.pop(item[0], (DEFAULT_ACCOUNT, None))
+            self.claimed.setdefault(account, deque()).appendleft(item)
+            self._gauge()
+
+    def release_unknown(self, accounts: Set[str]):
+        # claim dari akun yang sudah tidak ada di konfigurasi dikembalikan ke antrean umum
+        with self.lock:
+            for account in [a for a in self.claimed if a not in accounts]:
+                self.pending.extendleft(reversed(self.claimed.pop(account)))
+            self.compact()
+
+    def discard(self, texts: Set[str]) -> int:
+        # buang item yang belum diposting dengan teks tertentu; index dan claim item lain tetap
+        with self.lock:
+            dropped = [i for i, text in self.pending if text in texts]
+            self.pending = deque((i, text) for i, text in self.pending if text not in texts)
+            for account, q in self.claimed.items():
+                dropped += [i for i, text in q if text in texts]
+                self.claimed[account] = deque((i, text) for i, text in q if text not in texts)
+            if dropped:
+                self._append([{"op": "done", "i": i} for i in dropped])
+                self._gauge()
+            return len(dropped)
+
+    def mark_done(self, index: int):
+        with self.lock:
+            self.in_flight.pop(index, None)
+            self._append([{"op": "done", "i": index}])
+            self._gauge()
+            self.done_since_compact += 1
+            if self.done_since_compact >= QUEUE_COMPACT_EVERY:
+                self.compact()
+
+    def compact(self):
+        with self.lock:
+            owned = [(i, text, acct) for i, (acct, text) in self.in_flight.items()]
+            owned += [(i, text, acct) for acct, q in self.claimed.items() for i, text in q]
+            self._write([(i, text, None) for i, text in self.pending] + owned)
+
+    def replace(self, texts: List[str]):
+        with self.lock:
+            self.claimed.clear()
+            self.in_flight.clear()
+            self._write([(i, text, None) for i, text in enumerate(texts)])
+
+    def _write(self, items: List[Tuple[int, str, Optional[str]]]):
+        if self.read_only:
+            raise RuntimeError("QueueStore read_only tidak boleh ditulis")
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for i, text, acct in sorted(items):
+                f.write(json.dumps({"op": "add", "i": i, "text": text}, ensure_ascii=False) + "\n")
+                if acct is not None:
+                    f.write(json.dumps({"op": "claim", "i": i, "acct": acct}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        _fsync_dir(self.path.parent)
+        self.pending = deque((i, text) for i, text, acct in sorted(items) if acct is None)
+        self.next_index = max(self.next_index, max((i for i, _, _ in items), default=-1) + 1)
+        self.done_since_compact = 0
+        self._gauge()
+
+    def close(self):
+        with self.lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            if self._lock_fh is not None:
+                self._lock_fh.close()   # kunci ikut lepas
+                self._lock_fh = None
+
+_queue_store: Optional[QueueStore] = None
+
+def queue_store() -> QueueStore:
+    global _queue_store
+    if _queue_store is None:
+        _queue_store = QueueStore()
+    return _queue_store
+
 def save_queue(queue: List[str]):
-    with open(QUEUE_JSON, "w", encoding="utf-8") as f:
-        json.dump(queue, f, ensure_ascii=False, indent=2)
+    queue_store().replace(queue)
 
 def load_queue() -> List[str]:
-    if QUEUE_JSON.exists():
-        with open(QUEUE_JSON, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    return list(queue_store())
 
 #########################
 # PIPELINE
 #########################
+_SHARD_UNSAFE = re.compile(r"[^a-z0-9.-]")
+
+class PostsStore:
+    """
+    Arsip semua postingan hasil scrape: data/posts/<domain>.jsonl, satu {"title", "url", "scraped_at"}
+    per baris. Hanya ditambah (append), dibaca sebagai stream. Untuk cek `url in store`, digest URL
+    satu domain dimuat saat pertama kali dibutuhkan, jadi domain lain tidak ikut masuk RAM.
+    """
+
+    def __init__(self, directory: pathlib.Path = POSTS_DIR):
+        self.dir = directory
+        self.lock = threading.Lock()
+        self._digests: Dict[str, Set[bytes]] = {}
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._migrate_json()
+
+    @staticmethod
+    def _digest(url: str) -> bytes:
+        return hashlib.sha1(url.strip().encode("utf-8")).digest()
+
+    def _shard(self, dom: str) -> pathlib.Path:
+        return self.dir / (_SHARD_UNSAFE.sub("_", dom) + ".jsonl")
+
+    def _migrate_json(self):
+        if not POSTS_JSON.exists():
+            return
+        try:
+            with open(POSTS_JSON, "r", encoding="utf-8") as f:
+                posts = [(x["title"], x["url"]) for x in json.load(f)]
+        except (IOError, ValueError, KeyError):
+            logging.warning(f"{POSTS_JSON} rusak, tidak dimigrasi.")
+            return
+        added = self.add(posts)
+        POSTS_JSON.rename(POSTS_JSON.with_suffix(".json.migrated"))
+        logging.info(f"Arsip {POSTS_JSON} dipindah ke {self.dir} ({added} postingan)")
+
+    @staticmethod
+    def _read(path: pathlib.Path) -> Iterator[Tuple[str, str]]:
+        try:
+            f = open(path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                    yield rec["title"], rec["url"]
+                except (ValueError, KeyError):
+                    continue  # baris terpotong karena crash
+
+    def _known(self, dom: str) -> Set[bytes]:
+        # dipanggil dengan self.lock dipegang
+        known = self._digests.get(dom)
+        if known is None:
+            known = {self._digest(url) for _, url in self._read(self._shard(dom))}
+            self._digests[dom] = known
+        return known
+
+    def __contains__(self, url) -> bool:
+        if not isinstance(url, str) or not url:
+            return False
+        with self.lock:
+            return self._digest(url) in self._known(domain_of(url.strip()))
+
+    def add(self, posts: Iterable[Tuple[str, str]]) -> int:
+        # tambahkan yang belum ada di arsip; kembalikan jumlah postingan baru
+        by_domain: Dict[str, List[str]] = {}
+        now = int(time.time())
+        with self.lock:
+            for title, url in posts:
+                title, url = title.strip(), url.strip()
+                if not title or not url:
+                    continue
+                dom = domain_of(url)
+                known = self._known(dom)
+                digest = self._digest(url)
+                if digest in known:
+                    continue
+                known.add(digest)
+                by_domain.setdefault(dom, []).append(
+                    json.dumps({"title": title, "url": url, "scraped_at": now}, ensure_ascii=False) + "\n"
+                )
+            for dom, lines in by_domain.items():
+                path = self._shard(dom)
+                with open(path, "a+b") as f:
+                    # baris terakhir terpotong (crash) jangan sampai tersambung dengan record baru
+                    if f.tell() > 0:
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b"\n":
+                            f.write(b"\n")
+                    f.write("".join(lines).encode("utf-8"))
+        return sum(len(lines) for lines in by_domain.values())
+
+    def shards(self) -> List[pathlib.Path]:
+        return sorted(self.dir.glob("*.jsonl"))
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        for path in self.shards():
+            yield from self._read(path)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def sample(self, k: int) -> List[Tuple[str, str]]:
+        return reservoir_sample(self, k)
+
+def archive_size(directory: pathlib.Path = POSTS_DIR) -> Tuple[int, int]:
+    # (jumlah domain, jumlah postingan) tanpa parse JSON: cukup hitung baris lengkap tiap shard
+    shards = sorted(directory.glob("*.jsonl"))
+    posts = 0
+    for path in shards:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                posts += chunk.count(b"\n")
+    return len(shards), posts
+
+def reservoir_sample(items: Iterable, k: int, rng: random.Random = random) -> List:
+    # sampel acak k item dari stream sepanjang apa pun dengan memori O(k) (algoritma R)
+    sample: List = []
+    for n, item in enumerate(items):
+        if n < k:
+            sample.append(item)
+        else:
+            j = rng.randrange(n + 1)
+            if j < k:
+                sample[j] = item
+    return sample
+
+_posts_store: Optional[PostsStore] = None
+
+def posts_store() -> PostsStore:
+    global _posts_store
+    if _posts_store is None:
+        _posts_store = PostsStore()
+    return _posts_store
+
+def scrape_and_merge(already: Container[str], scrape_only: bool = False) -> PostsStore:
+    archive = posts_store()
+    if INCREMENTAL_SCRAPE and archive.shards():
+        new_posts = gather_all_posts(AnyOf(archive, already), scrape_only=scrape_only)
+    else:
+        new_posts = gather_all_posts(scrape_only=scrape_only)
+    added = archive.add(new_posts)
+    logging.info(f"Scrape: {added} postingan baru masuk arsip {archive.dir}.")
+    return archive
+
 def load_home_tweets() -> List[str]:
     if not HOME_TWEET_FILE.exists():
         return []
     with open(HOME_TWEET_FILE, "r", encoding="utf-8") as f:
         return [line.strip() for line in f if line.strip()]
 
-def build_queue(posts: List[Tuple[str, str]], home_tweets: List[str], already: Set[str]) -> List[str]:
+def fresh_posts(posts: Iterable[Tuple[str, str]], already: Container[str],
+                threshold: Optional[float] = None) -> Iterator[Tuple[str, str]]:
+    # buang yang sudah diposting atau duplikatnya: URL persis/kanonik, teks persis, atau judul yang
+    # mirip (LSH, lihat TitleIndex); duplikat di dalam batch ini sendiri juga dibuang.
+    # threshold None -> NEAR_DUP_THRESHOLD; dibawa di TitleKey supaya riwayat dan indeks memakai angka yang sama
+    if threshold is None:
+        threshold = NEAR_DUP_THRESHOLD
+    seen_urls: Set[str] = set()
+    titles = TitleIndex()
+    near_dups = 0
+    for title, url in posts:
+        if url in already or text_hash(f"{title} {url}") in already:
+            continue
+        canon = canonical_url(url)
+        if canon in seen_urls or canon in already:
+            continue
+        key = title_key(title, threshold) if threshold > 0 else None
+        if key is not None and (key in titles or key in already):
+            near_dups += 1
+            METRICS.inc("posts_near_duplicate_total")
+            logging.debug(f"Judul mirip yang sudah ada, dilewati: {title} ({url})")
+            continue
+        seen_urls.add(canon)
+        titles.add(key)
+        yield title, url
+    if near_dups:
+        logging.info(f"{near_dups} postingan dilewati karena judulnya mirip postingan lain (ambang {threshold}).")
+
+def build_queue(posts: Iterable[Tuple[str, str]], home_tweets: List[str], already: Container[str],
+                limit: int = QUEUE_BUILD_LIMIT) -> List[str]:
+    # posts boleh berupa stream (mis. PostsStore); yang sudah diposting dibuang sambil dibaca,
+    # jadi yang ditahan di memori hanya kandidat antrean (maks `limit`), bukan seluruh arsip
+    fresh = fresh_posts(posts, already)
+    candidates = reservoir_sample(fresh, limit) if limit > 0 else list(fresh)
     queue: List[str] = []
     seen_home_tweets: Set[str] = set()
     home_i = 0
     home_len = len(home_tweets)
-    random.shuffle(posts)
+    random.shuffle(candidates)
+    posts = spread_by_domain(candidates, SAME_DOMAIN_GAP)
     count_since_home = 0
     for title, url in posts:
         tweet_text = f"{title} {url}"
-        th = text_hash(tweet_text)
-        if url in already or th in already:
-            continue
         queue.append(tweet_text)
         count_since_home += 1
         if home_len > 0 and count_since_home >= TWEETS_BEFORE_HOME:
@@ -458,100 +2479,420 @@ def build_queue(posts: List[Tuple[str, str]], home_tweets: List[str], already: S
             count_since_home = 0
     return queue
 
-def gather_all_posts() -> List[Tuple[str, str]]:
+@profiled("gather_all_posts")
+@METRICS.timed("gather_seconds")
+def gather_all_posts(known: Optional[Container[str]] = None, scrape_only: bool = False,
+                     sites: Optional[List[Site]] = None) -> List[Tuple[str, str]]:
+    # scrape_only -> Chrome headless tanpa gambar dengan profil sementara, bukan sesi utama
     posts: List[Tuple[str, str]] = []
-    
-    non_selenium_cats = [c for c in CATEGORIES if domain_of(c) not in LOAD_MORE_DOMAINS]
-    
-    for cat in non_selenium_cats:
-        posts.extend(scrape_pagination(cat, MAX_PAGES_PER_SITE))
-        
-    selenium_cats = [c for c in CATEGORIES if domain_of(c) in LOAD_MORE_DOMAINS]
-    
-    if selenium_cats:
-        drv = build_driver()
-        try:
-            for cat in selenium_cats:
-                dom = domain_of(cat)
-                if dom in ["villapermatagroup.com", "houseofasiyah.com", "haidartours.com"]:
-                    posts.extend(scrape_load_more(drv, cat, MAX_PAGES_PER_SITE))
-                elif dom == "tatarapilaundry.com":
-                    # KARENA SEKARANG DIANGGAP NON-SELENIUM, BLOK INI TIDAK AKAN PERNAH DIJALANKAN
-                    posts.extend(scrape_pagination_with_selenium(drv, cat, MAX_PAGES_PER_SITE))
+    prune_http_cache()
+    if sites is None:
+        sites = load_sites()
+
+    http_sites = [s for s in sites if s.method == "http"]
+    if http_sites:
+        with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_FETCHES, len(http_sites))) as pool:
+            for site_posts in pool.map(lambda s: scrape_pagination(s.url, s.max_pages, known, s.pagination), http_sites):
+                posts.extend(site_posts)
+
+    # coba REST WordPress dulu; yang tidak punya baru diserahkan ke Selenium
+    rest_sites = [s for s in sites if s.method == "rest"]
+    selenium_sites = [s for s in sites if s.method == "selenium"]
+    if rest_sites:
+        with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_FETCHES, len(rest_sites))) as pool:
+            rest_results = list(pool.map(lambda s: scrape_wp_rest(s.url, s.max_pages, known), rest_sites))
+        for site, site_posts in zip(rest_sites, rest_results):
+            if site_posts is None:
+                selenium_sites.append(site)
+            else:
+                posts.extend(site_posts)
+
+    jobs = [(scrape_load_more, s.url, s.max_pages, known) for s in selenium_sites]
+    if jobs:
+        size = selenium_pool_size(len(jobs))
+        if scrape_only or size > 1:
+            for site_posts in run_selenium_pool(jobs, size):
+                posts.extend(site_posts)
+        else:
+            # cuma muat satu Chrome: pakai sesi utama yang nanti juga dipakai posting
+            drivers = shared_driver()
+            for fn, *args in jobs:
+                posts.extend(drivers.run(fn, *args))
+
+    fetch_stats_report()
+    posts = dedupe_posts(posts)
+    METRICS.set("posts_gathered", len(posts))
+    METRICS.export()
+    return posts
+
+#########################
+# POSTING
+#########################
+def load_accounts() -> List[Dict]:
+    default = [{"name": DEFAULT_ACCOUNT, "profile_dir": str(CHROME_PROFILE_DIR)}]
+    if not ACCOUNTS_JSON.exists():
+        return default
+    with open(ACCOUNTS_JSON, "r", encoding="utf-8") as f:
+        accounts = json.load(f)
+    names = [a["name"] for a in accounts]
+    if not accounts or len(set(names)) != len(names):
+        raise ValueError(f"{ACCOUNTS_JSON}: daftar akun kosong atau ada nama yang dobel")
+    for acct in accounts:
+        acct.setdefault("profile_dir", f"./chrome_profile_{acct['name']}")
+    return accounts
+
+def account_scheduler(account: Dict) -> PostScheduler:
+    if account["name"] == DEFAULT_ACCOUNT:
+        return PostScheduler()
+    return PostScheduler(
+        state_path=OUTPUT_DIR / f"scheduler_{account['name']}.json",
+        per_hour=account.get("per_hour", POST_LIMIT_PER_HOUR),
+        per_day=account.get("per_day", POST_LIMIT_PER_DAY),
+        windows=account.get("windows"),
+    )
+
+def post_worker(account: Dict, store: QueueStore, stop: Optional[threading.Event] = None,
+                keep_running: bool = False):
+    # keep_running (mode daemon): antrean kosong bukan akhir, tunggu item baru sampai `stop`
+    name = account["name"]
+    scheduler = account_scheduler(account)
+    if name == DEFAULT_ACCOUNT:
+        # akun tunggal pakai sesi Chrome utama yang mungkin sudah hangat dari scraping
+        drivers = shared_driver()
+    else:
+        profile = pathlib.Path(account["profile_dir"])
+        profile.mkdir(parents=True, exist_ok=True)
+        drivers = DriverManager(headless=account.get("headless", POST_HEADLESS), profile_dir=profile)
+    tag = "" if name == DEFAULT_ACCOUNT else f"[{name}] "
+
+    try:
+        open_home(drivers.get())
+        drivers.on_restart = open_home
+        processed = 0  # counter tweet akun ini
+        with profiled(f"post_{name}"):
+            while stop is None or not stop.is_set():
+                if not store:
+                    if not keep_running:
+                        break
+                    stop.wait(DAEMON_IDLE_POLL)
+                    continue
+                if not scheduler.wait_turn(stop):
+                    break
+                item = store.claim(name)
+                if item is None:
+                    # sisa antrean milik akun lain
+                    if not keep_running:
+                        break
+                    stop.wait(DAEMON_IDLE_POLL)
+                    continue
+                index, text = item
+                processed += 1
+                logging.info(f"{tag}[{processed}/{processed + len(store)}] Posting: {text[:80]}...")
+
+                driver = drivers.get()
+                with METRICS.timed("post_seconds", account=name):
+                    sent = send_tweet_on_home(driver, text)
+                if detect_rate_limit(driver):
+                    METRICS.inc("rate_limited_total", account=name)
+                    scheduler.record_rate_limited()
+                    store.push_front(item)
+                    processed -= 1
+                    continue
+                if sent:
+                    # scroll natural biar page nggak kebablasan turun
+                    scroll_natural(driver)
+
+                    record_posted(text)
+                    scheduler.record_success()
+                    METRICS.inc("tweets_posted_total", account=name)
                 else:
-                    logging.warning(f"Domain {dom} tidak memiliki metode scraping Selenium yang spesifik. Melewati.")
-        finally:
-            drv.quit()
-    
-    return dedupe_posts(posts)
+                    METRICS.inc("tweets_failed_total", account=name)
+                    logging.warning(f"{tag}Tweet gagal dikirim, dilewati.")
+                store.mark_done(index)
+                try:
+                    METRICS.export()
+                except OSError as e:
+                    # metrik cuma pelengkap, jangan sampai menghentikan posting
+                    logging.warning(f"{tag}Gagal menulis metrik: {e}")
+    finally:
+        drivers.quit()
 
 #########################
 # MAIN
 #########################
 def main():
+    ensure_dirs()
     prompt_reset()
     already = load_posted()
-    queue = load_queue()
+    store = queue_store()
 
-    if not queue:
-        posts = []
+    if not store:
+        posts = posts_store()
         scrape_again = prompt_scrape_again()
         
-        if scrape_again or not POSTS_JSON.exists():
+        if scrape_again or not posts.shards():
             logging.info("Memulai proses scraping...")
-            posts = gather_all_posts()
-            with open(POSTS_JSON, "w", encoding="utf-8") as f:
-                json.dump([{"title": t, "url": u} for t, u in posts], f, ensure_ascii=False, indent=2)
+            posts = scrape_and_merge(already)
         else:
-            logging.info("Memuat data postingan dari posts.json...")
-            try:
-                posts_data = json.load(open(POSTS_JSON, "r", encoding="utf-8"))
-                posts = [(x["title"], x["url"]) for x in posts_data]
-            except (IOError, json.JSONDecodeError):
-                logging.warning("Gagal memuat posts.json, melakukan scraping sebagai cadangan.")
-                posts = gather_all_posts()
-                with open(POSTS_JSON, "w", encoding="utf-8") as f:
-                    json.dump([{"title": t, "url": u} for t, u in posts], f, ensure_ascii=False, indent=2)
+            logging.info(f"Memuat data postingan dari {posts.dir}...")
 
         home_tweets = load_home_tweets()
+        # urutan dari build_queue dipertahankan (sisipan home tweet + jarak antar domain)
         queue = build_queue(posts, home_tweets, already)
-        random.shuffle(queue)
-        save_queue(queue)
+        store.replace(queue)
 
-    if not queue:
+    if not store:
         logging.info("Tidak ada tweet baru.")
+        close_shared_driver()
         return
 
-    driver = build_driver()
+    accounts = load_accounts()
+    if DEFAULT_ACCOUNT not in {a["name"] for a in accounts}:
+        # multi-akun: sesi utama sisa scraping tidak dipakai worker mana pun, jangan biarkan terbuka
+        close_shared_driver()
+    store.release_unknown({a["name"] for a in accounts})
     print("\n>>> Login X/Twitter jika belum login, lalu biarkan script jalan.\n")
-    driver.get("https://x.com/home")
-    wait_home_ready(driver, timeout=60)
+    if len(accounts) == 1:
+        post_worker(accounts[0], store)
+    else:
+        # tiap akun punya thread, Chrome, profil, dan penjadwal sendiri; antrean dibagi lewat claim
+        threads = [threading.Thread(target=post_worker, args=(acct, store), name=acct["name"]) for acct in accounts]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    store.compact()
+    METRICS.export()
+    logging.info("Tweet Selesai !!! 🎉")
 
-    posted_now: List[str] = []
-    total = len(queue)  # total tweet di antrean
-    processed = 0       # counter tweet
+def scrape_only_main():
+    ensure_dirs()
+    posts = scrape_and_merge(load_posted(), scrape_only=True)
+    logging.info(f"Scrape selesai: {len(posts)} postingan di {posts.dir}.")
 
-    while queue:
-        text = queue.pop(0)
-        processed += 1
-        logging.info(f"[{processed}/{total}] Posting: {text[:80]}...")
+#########################
+# DAEMON
+#########################
+def load_daemon_config(path: pathlib.Path = DAEMON_JSON) -> Dict:
+    # opsional, mis. {"scrape_interval": 21600, "scrape_on_start": true, "idle_poll": 60, "headless": true}
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def refresh_queue(store: QueueStore, already: Container[str]) -> int:
+    # scrape inkremental pakai Chrome headless sendiri, jadi sesi Chrome posting tidak diganggu
+    posts = scrape_and_merge(already, scrape_only=True)
+    queue = build_queue(posts, load_home_tweets(), queue_filter(store, already))
+    store.extend(queue)
+    return len(queue)
+
+def queue_filter(store: QueueStore, already: Container[str]) -> AnyOf:
+    # riwayat + semua yang sudah ada di antrean, supaya tweet yang sama tidak masuk dua kali
+    queued: Set[str] = set()
+    queued_titles = TitleIndex()
+    for text in store.known_texts():
+        queued.update(tweet_keys(text))
+        queued_titles.add(title_key(URL_RE.sub("", text)))
+    return AnyOf(already, queued, queued_titles)
+
+def refresh_loop(store: QueueStore, already: Container[str], stop: threading.Event,
+                 interval: float, scrape_on_start: bool = True):
+    if not scrape_on_start and stop.wait(interval):
+        return
+    while not stop.is_set():
+        try:
+            added = refresh_queue(store, already)
+            logging.info(f"Refresh: {added} tweet baru masuk antrean ({len(store)} menunggu).")
+        except Exception as e:
+            logging.error(f"Refresh antrean gagal, dicoba lagi nanti: {e}")
+        if stop.wait(interval):
+            return
 
-        if send_tweet_on_home(driver, text):
-            # scroll natural biar page nggak kebablasan turun
-            scroll_natural(driver)
+def daemon_main(config: Dict):
+    global INTERACTIVE, POST_HEADLESS, DAEMON_IDLE_POLL
+    INTERACTIVE = False
+    POST_HEADLESS = config.get("headless", POST_HEADLESS)
+    DAEMON_IDLE_POLL = config.get("idle_poll", DAEMON_IDLE_POLL)
+    interval = config.get("scrape_interval", DAEMON_SCRAPE_INTERVAL)
 
-            urls = re.findall(r'https?://[^\s]+', text)
-            if urls:
-                posted_now.extend(urls)
-            posted_now.append(text_hash(text))
+    stop = threading.Event()
 
-            save_posted(posted_now)
-            posted_now.clear()
-            save_queue(queue)
-            rand_delay(*DELAY_TWEET_RANGE)
+    def on_signal(signum, frame):
+        logging.info(f"{signal.Signals(signum).name} diterima, berhenti setelah tweet yang sedang jalan...")
+        stop.set()
 
-    driver.quit()
-    logging.info("Tweet Selesai !!! 🎉")
+    signal.signal(signal.SIGTERM, on_signal)
+    signal.signal(signal.SIGINT, on_signal)
+
+    ensure_dirs()
+    already = load_posted()
+    store = queue_store()
+    accounts = load_accounts()
+    store.release_unknown({a["name"] for a in accounts})
+
+    refresher = threading.Thread(target=refresh_loop, name="refresh",
+                                 args=(store, already, stop, interval, config.get("scrape_on_start", True)))
+    workers = [threading.Thread(target=post_worker, args=(acct, store, stop, True), name=acct["name"]) for acct in accounts]
+    for t in [refresher] + workers:
+        t.start()
+    logging.info(f"Daemon jalan: {len(accounts)} akun, scrape ulang tiap {interval:.0f} detik.")
+
+    # thread utama cuma menunggu sinyal; wait() pakai timeout supaya handler sinyal sempat jalan
+    while not stop.wait(1):
+        if not any(t.is_alive() for t in workers):
+            logging.error("Semua thread posting berhenti (cek login/Chrome), daemon keluar.")
+            stop.set()
+    for t in [refresher] + workers:
+        t.join()
+
+    store.compact()
+    store.close()
+    METRICS.export()
+    logging.info("Daemon berhenti.")
+
+#########################
+# STATUS & ENQUEUE
+#########################
+# Cuma membaca/menulis journal antrean, riwayat SQLite, dan arsip: tidak memuat selenium,
+# requests, atau lxml, jadi cepat untuk cron dan monitoring.
+def queue_status(show: int = 5) -> Dict:
+    # journal dibaca tanpa compact, aman dipanggil selagi bot/daemon jalan
+    store = QueueStore(read_only=True)
+    with store.lock:
+        pending = list(store.pending)
+        claimed = {acct: len(q) for acct, q in store.claimed.items() if q}
+    store.close()
+    if POSTED_DB.exists():
+        history_db = PostedHistory(read_only=True)
+        history = history_db.stats()
+        history_db.close()
+    else:
+        history = {"entries": 0, "titles": 0, "last_posted_at": None}
+    domains, posts = archive_size()
+    archive = {"domains": domains, "posts": posts}
+    schedule = {}
+    for account in load_accounts():
+        sched = account_scheduler(account)
+        wait, reason = sched.delay()
+        schedule[account["name"]] = {
+            "wait_seconds": round(wait, 1),
+            "reason": reason if wait > 0 else None,
+            "left_this_hour": int(sched.hour.tokens) if sched.hour.capacity > 0 else None,
+            "left_today": int(sched.day.tokens) if sched.day.capacity > 0 else None,
+            "factor": round(sched.factor, 2),
+        }
+    return {
+        "queue": {"pending": len(pending), "claimed": claimed, "next": [text for _, text in pending[:show]]},
+        "history": history,
+        "archive": archive,
+        "schedule": schedule,
+    }
+
+def status_main(show: int = 5, as_json: bool = False):
+    status = queue_status(show)
+    if as_json:
+        print(json.dumps(status, ensure_ascii=False, indent=2))
+        return
+    queue, history, archive = status["queue"], status["history"], status["archive"]
+    claimed = ", ".join(f"{acct}: {n}" for acct, n in queue["claimed"].items())
+    print(f"Antrean : {queue['pending']} menunggu" + (f", di-claim ({claimed})" if claimed else ""))
+    for i, text in enumerate(queue["next"], 1):
+        print(f"  {i}. {text[:100]}")
+    last = history["last_posted_at"]
+    last = datetime.fromtimestamp(last).strftime("%Y-%m-%d %H:%M") if last else "-"
+    print(f"Riwayat : {history['entries']} entri, {history['titles']} judul, terakhir {last}")
+    print(f"Arsip   : {archive['posts']} postingan dari {archive['domains']} domain")
+    for name, st in status["schedule"].items():
+        when = "boleh posting sekarang" if not st["reason"] else f"tunggu {st['wait_seconds']:.0f} detik ({st['reason']})"
+        left = lambda n: "tanpa batas" if n is None else n
+        print(f"Jadwal [{name}]: {when}, sisa {left(st['left_this_hour'])}/jam {left(st['left_today'])}/hari, "
+              f"delay x{st['factor']}")
+
+def enqueue_main(texts: List[str], path: Optional[str] = None, mark_posted: bool = False,
+                 clear: bool = False, force: bool = False):
+    # journal dikunci oleh bot/daemon yang sedang jalan, jadi perintah ini menolak selama itu
+    texts = list(texts)
+    if path:
+        if path == "-":
+            texts += sys.stdin.read().splitlines()
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                texts += f.read().splitlines()
+    texts = [t.strip() for t in texts if t.strip()]
+
+    try:
+        store = queue_store()
+    except QueueLockedError as e:
+        logging.error(str(e))
+        sys.exit(1)
+    if clear:
+        logging.info(f"Antrean dikosongkan ({len(store)} tweet dibuang).")
+        store.replace([])
+    if mark_posted:
+        for text in texts:
+            record_posted(text)
+        # post_worker tidak mengecek riwayat lagi, jadi teks yang sama dibuang dari antrean
+        store.discard(set(texts))
+        logging.info(f"{len(texts)} tweet dicatat ke riwayat sebagai sudah diposting ({len(store)} menunggu).")
+        store.close()
+        return
+
+    known = queue_filter(store, load_posted())
+    batch: Set[str] = set()
+    fresh = []
+    for text in texts:
+        keys = tweet_keys(text)
+        if not force and any(k in known or k in batch for k in keys):
+            logging.info(f"Dilewati, sudah diposting atau sudah di antrean: {text[:80]}")
+            continue
+        batch.update(keys)
+        fresh.append(text)
+    store.extend(fresh)
+    store.close()
+    logging.info(f"{len(fresh)} tweet masuk antrean ({len(store)} menunggu).")
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser(description="Bot tweet otomatis tanpa API.")
+    ap.add_argument("--scrape-only", action="store_true",
+                    help="cuma scrape ulang arsip data/posts/ (Chrome headless tanpa gambar), tidak posting")
+    ap.add_argument("--profile", choices=("cprofile", "pyinstrument"),
+                    help="profil gather_all_posts dan loop posting, hasil di data/profile_*")
+    sub = ap.add_subparsers(dest="command")
+    dp = sub.add_parser("daemon", help="jalan terus tanpa input(): scrape berkala sambil posting")
+    dp.add_argument("--config", type=pathlib.Path, default=DAEMON_JSON,
+                    help=f"file JSON setelan daemon (default {DAEMON_JSON})")
+    dp.add_argument("--scrape-interval", type=float, help="detik antar scrape ulang")
+    dp.add_argument("--idle-poll", type=float, help="detik cek ulang antrean saat kosong")
+    dp.add_argument("--headless", action=argparse.BooleanOptionalAction, default=None,
+                    help="Chrome posting headless (profil harus sudah login)")
+    dp.add_argument("--scrape-on-start", action=argparse.BooleanOptionalAction, default=None,
+                    help="langsung scrape saat start (default ya)")
+    stp = sub.add_parser("status", help="ringkasan antrean, riwayat, arsip, dan jadwal (tanpa browser)")
+    stp.add_argument("--show", type=int, default=5, help="jumlah tweet berikutnya yang ditampilkan")
+    stp.add_argument("--json", action="store_true", help="keluaran JSON, untuk monitoring")
+    ep = sub.add_parser("enqueue", help="tambah tweet ke antrean atau tandai sudah diposting (tanpa browser); "
+                                        "ditolak selagi bot/daemon jalan")
+    ep.add_argument("texts", nargs="*", help="teks tweet")
+    ep.add_argument("--file", help="file berisi satu tweet per baris, '-' = stdin")
+    ep.add_argument("--posted", action="store_true", help="catat ke riwayat sebagai sudah diposting dan buang dari antrean")
+    ep.add_argument("--clear", action="store_true", help="kosongkan antrean dulu")
+    ep.add_argument("--force", action="store_true", help="tetap masukkan walau sudah diposting atau sudah di antrean")
+    args = ap.parse_args()
+    PROFILER = args.profile
+    if args.command == "status":
+        status_main(args.show, args.json)
+    elif args.command == "enqueue":
+        enqueue_main(args.texts, args.file, args.posted, args.clear, args.force)
+    elif args.command == "daemon":
+        # flag CLI menimpa isi file config
+        config = load_daemon_config(args.config)
+        for key in ("scrape_interval", "idle_poll", "headless", "scrape_on_start"):
+            if getattr(args, key) is not None:
+                config[key] = getattr(args, key)
+        daemon_main(config)
+    elif args.scrape_only:
+        scrape_only_main()
+    else:
+        main()